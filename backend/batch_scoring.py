@@ -0,0 +1,217 @@
+# Vectorized scoring of whole cohorts against the career index
+import numpy as np
+
+from recommender import RELATED_CAREERS, SIMILARITY_THRESHOLD, similar
+
+# Profiles scored together at most; chunks also keep profiles x careers under COUNTS_SIZE
+CHUNK_SIZE = 1024
+COUNTS_SIZE = 1 << 20
+
+
+class BatchScorer:
+    """Scores many keyword sets at once with one counting pass per chunk.
+
+    Careers are held as a sparse keyword-incidence matrix in CSR form: per
+    vocabulary term, the slice of `indices` between consecutive `indptr`
+    entries lists the careers having it. For every profile in a chunk the
+    postings of the terms it contains (exact overlap) and of the terms similar
+    to each of its keywords (partial matches) are counted with one bincount
+    each, yielding both counts for every profile/career pair, which combine
+    into the same scores and order as CareerIndex.top. Memory grows with the
+    number of postings rather than vocabulary x careers.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.vocabulary = {term: i for i, term in enumerate(index.postings)}
+
+        lengths = [len(career_ids) for career_ids in index.postings.values()]
+        self.indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        self.indices = np.fromiter(
+            (career_id for career_ids in index.postings.values() for career_id in career_ids),
+            dtype=np.int32, count=int(self.indptr[-1]),
+        )
+
+        self.tiebreak = self.title_tiebreak(index)
+
+    @staticmethod
+    def title_tiebreak(index):
+        # Larger is better: highest score first, then title, then catalog order
+        return len(index.rank) - 1 - np.asarray(index.rank, dtype=np.int64)
+
+    def postings(self, term_id):
+        return self.indices[self.indptr[term_id]:self.indptr[term_id + 1]]
+
+    def counts(self, keyword_sets):
+        """(exact, partial) match counts, each a (profiles, careers) array."""
+        n_careers = len(self.index.careers)
+        vocabulary = self.vocabulary
+        matches = self.index.fuzzy.matches
+        exact, fuzzy = [], []
+        for row, keywords in enumerate(keyword_sets):
+            # Career ids are shifted into the row's block of the flattened counts
+            offset = row * n_careers
+            for kw in keywords:
+                term_id = vocabulary.get(kw)
+                if term_id is not None:
+                    exact.append(self.postings(term_id) + offset)
+                for term in matches(kw):
+                    fuzzy.append(self.postings(vocabulary[term]) + offset)
+        shape = (len(keyword_sets), n_careers)
+        return tuple(
+            np.bincount(
+                np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64), minlength=shape[0] * shape[1]
+            ).reshape(shape)
+            for ids in (exact, fuzzy)
+        )
+
+    def score(self, keyword_sets, top_k=3):
+        """Top `top_k` (career_id, score) pairs for each expanded keyword set."""
+        chunk = max(1, min(CHUNK_SIZE, COUNTS_SIZE // max(len(self.index.careers), 1)))
+        results = []
+        for start in range(0, len(keyword_sets), chunk):
+            results.extend(self._score_chunk(keyword_sets[start:start + chunk], top_k))
+        return results
+
+    def _score_chunk(self, keyword_sets, top_k):
+        exact, fuzzy = self.counts(keyword_sets)
+
+        n_careers = exact.shape[1]
+        k = min(top_k, n_careers)
+        if k <= 0:
+            return [[] for _ in keyword_sets]
+        # Scores are multiples of 0.5, so 2*score orders them exactly
+        keys = (2 * exact + fuzzy) * n_careers + self.tiebreak
+        if k < n_careers:
+            top = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(n_careers), keys.shape)
+        top_keys = np.take_along_axis(keys, top, axis=1)
+        top = np.take_along_axis(top, np.argsort(-top_keys, axis=1), axis=1)
+
+        results = []
+        for row, career_ids in enumerate(top.tolist()):
+            ranked = []
+            for career_id in career_ids:
+                overlap = int(exact[row, career_id])
+                partial = int(fuzzy[row, career_id])
+                if not overlap and not partial:
+                    break
+                ranked.append((career_id, overlap + 0.5 * partial if partial else overlap))
+            results.append(ranked)
+        return results
+
+
+class RelatedCareers:
+    """Each career's `size` most similar careers, precomputed as (careers, size) arrays.
+
+    Similarity is the recommender's own score with one career's keywords as
+    the profile: one point per shared keyword plus 0.5 per similar-but-different
+    keyword pair, ties broken by title. Rows are best first; unused slots hold
+    career id -1.
+    """
+
+    def __init__(self, ids, scores):
+        self.ids = ids
+        self.scores = scores
+
+    @classmethod
+    def build(cls, index, size=RELATED_CAREERS):
+        n = len(index.careers)
+        terms = list(index.postings)
+        term_ids = {term: i for i, term in enumerate(terms)}
+        postings = [np.asarray(index.postings[term], dtype=np.int64) for term in terms]
+
+        # Per term, the careers a profile containing it adds to: weight 2 for the
+        # careers having the term, 1 per similar term (scores are doubled here)
+        spread = []
+        for term, similar_terms in zip(terms, similar_pairs(terms)):
+            ids = [postings[term_ids[term]]] + [postings[j] for j in similar_terms]
+            weights = [np.full(len(postings[term_ids[term]]), 2.0)] + [np.ones(len(postings[j])) for j in similar_terms]
+            spread.append((np.concatenate(ids), np.concatenate(weights)))
+
+        ids = np.full((n, size), -1, dtype=np.int32)
+        scores = np.zeros((n, size), dtype=np.float32)
+        tiebreak = BatchScorer.title_tiebreak(index)
+        chunk = max(1, (1 << 22) // max(n, 1))
+        for start in range(0, n, chunk):
+            rows = range(start, min(n, start + chunk))
+            flat_ids = []
+            flat_weights = []
+            for row, career_id in enumerate(rows):
+                for term in index.keywords[career_id]:
+                    career_ids, weights = spread[term_ids[term]]
+                    flat_ids.append(career_ids + row * n)
+                    flat_weights.append(weights)
+            doubled = np.bincount(
+                np.concatenate(flat_ids), np.concatenate(flat_weights), minlength=len(rows) * n
+            ).reshape(len(rows), n)
+            doubled[np.arange(len(rows)), np.asarray(rows)] = 0  # a career is not related to itself
+
+            # Only careers scoring at least the size-th best score can make a row;
+            # the title tie-break is applied to those few
+            k = min(size, n)
+            cutoff = np.maximum(np.partition(doubled, n - k, axis=1)[:, n - k], 1)
+            for row, career_id in enumerate(rows):
+                candidates = np.flatnonzero(doubled[row] >= cutoff[row])
+                best = candidates[np.lexsort((-tiebreak[candidates], -doubled[row, candidates]))][:size]
+                ids[career_id, :len(best)] = best
+                scores[career_id, :len(best)] = doubled[row, best] / 2
+        return cls(ids, scores)
+
+    def to_state(self):
+        return (self.ids.shape, self.ids.tobytes(), self.scores.tobytes())
+
+    @classmethod
+    def from_state(cls, state):
+        shape, ids, scores = state
+        return cls(
+            np.frombuffer(ids, dtype=np.int32).reshape(shape),
+            np.frombuffer(scores, dtype=np.float32).reshape(shape),
+        )
+
+    def score(self, career_id, other):
+        # Precomputed score of `other` for `career_id`; None unless it is one of the neighbours
+        hits = np.flatnonzero(self.ids[career_id] == other)
+        return float(self.scores[career_id, hits[0]]) if len(hits) else None
+
+    def neighbours(self, career_id, limit=None):
+        # [(career_id, score)], best first
+        ids = self.ids[career_id, :limit]
+        return [(int(i), float(s)) for i, s in zip(ids, self.scores[career_id, :limit]) if i >= 0]
+
+
+def similar_pairs(terms):
+    """For each term, the ids of the other terms `similar` to it.
+
+    FuzzyIndex's shared-character bound, computed for all pairs at once: with
+    one 0/1 feature per (character, k) meaning "has at least k of it", the
+    shared-character count min(count_a, count_b) summed over characters is a
+    dot product. Only pairs clearing the bound go through SequenceMatcher.
+    """
+    features = {}
+    rows, cols = [], []
+    for i, term in enumerate(terms):
+        seen = {}
+        for ch in term:
+            seen[ch] = seen.get(ch, 0) + 1
+            rows.append(i)
+            cols.append(features.setdefault((ch, seen[ch]), len(features)))
+    onehot = np.zeros((len(terms), max(len(features), 1)), dtype=np.float32)
+    onehot[rows, cols] = 1
+    lengths = np.array([len(term) for term in terms], dtype=np.float32)
+
+    result = []
+    chunk = max(1, (1 << 22) // max(len(terms), 1))
+    for start in range(0, len(terms), chunk):
+        shared = onehot[start:start + chunk] @ onehot.T
+        bound = 2.0 * shared / (lengths[start:start + chunk, None] + lengths[None, :])
+        # float32 rounding must not drop a pair, so the filter is a hair looser
+        for row, candidates in enumerate(bound > SIMILARITY_THRESHOLD - 1e-4):
+            term = terms[start + row]
+            result.append([
+                j for j in np.flatnonzero(candidates).tolist()
+                if j != start + row and similar(term, terms[j])
+            ])
+    return result
@@ -0,0 +1,47 @@
+# Microbenchmark: cost of authenticating a request with and without the token cache
+#
+#   cd backend && python benchmarks/auth_bench.py --iterations 20000
+#
+# Compares a full jwt.decode per request with verify_token's cached path, plus
+# the user lookup get_current_user does after either.
+import argparse
+import timeit
+
+import sandbox
+
+import main
+
+
+def run(args):
+    main.get_store().add_user({"username": "bench", "password": "bench"})
+    token = main.create_access_token({"sub": "bench"})
+    main.verify_token(token)
+
+    def uncached():
+        payload = main.jwt.decode(token, main.SECRET_KEY, algorithms=[main.ALGORITHM])
+        main.get_store().get_user(payload["sub"])
+
+    def cached():
+        main.get_store().get_user(main.verify_token(token))
+
+    def decode_only():
+        main.jwt.decode(token, main.SECRET_KEY, algorithms=[main.ALGORITHM])
+
+    def cache_only():
+        main.verify_token(token)
+
+    print(f"{'path':>28} {'us/request':>11} {'requests/s':>11}")
+    for label, func in (
+        ("jwt.decode", decode_only),
+        ("verify_token (cached)", cache_only),
+        ("jwt.decode + user lookup", uncached),
+        ("cached + user lookup", cached),
+    ):
+        seconds = min(timeit.repeat(func, number=args.iterations, repeat=3)) / args.iterations
+        print(f"{label:>28} {seconds * 1e6:11.2f} {1 / seconds:11.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    run(parser.parse_args())
@@ -0,0 +1,81 @@
+# Benchmark: bulk versus single-item signup and feedback ingestion
+#
+#   cd backend && python benchmarks/bulk_bench.py
+#   python benchmarks/bulk_bench.py --items 2000 --bulk-size 500 --concurrency 32
+#
+# Writes the same number of accounts and feedback entries through the
+# single-item endpoints (concurrently), through them again with group commit
+# turned off (one transaction per item, as before batching), and through the
+# bulk endpoints. Feedback is acknowledged before it is committed, so its
+# timings include draining the write-behind queue.
+import argparse
+import asyncio
+import os
+import time
+
+import sandbox
+os.environ["ADMIN_USERS"] = "bench-admin"
+
+import httpx
+
+import main
+from harness import drive
+
+
+def chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def run(args):
+    main.PASSWORD_COST = args.password_cost
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            await client.post("/auth/signup", json={"username": "bench-admin", "password": "bench"})
+            token = (await client.post(
+                "/auth/token", data={"username": "bench-admin", "password": "bench"}
+            )).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            async def timed(label, scenario):
+                start = time.perf_counter()
+                await scenario()
+                await main.feedback_writes.close()
+                elapsed = time.perf_counter() - start
+                print(f"{label:<32} {args.items / elapsed:10.1f} {elapsed:9.3f}")
+
+            def users(prefix):
+                return [{"username": f"{prefix}-{i}", "password": "bench"} for i in range(args.items)]
+
+            def feedbacks(prefix):
+                return [{"user_id": "bench-admin", "feedback": f"{prefix} {i}"} for i in range(args.items)]
+
+            print(f"{'scenario':<32} {'items/s':>10} {'seconds':>9}")
+            for label, max_batch in (("group commit", main.WRITE_BATCH_SIZE), ("per item", 1)):
+                main.user_writes.max_batch = main.feedback_writes.max_batch = max_batch
+                batch = users(label)
+                await timed(f"signup[{label}]", lambda: drive(
+                    lambda i: client.post("/auth/signup", json=batch[i]), args.items, args.concurrency))
+                notes = feedbacks(label)
+                await timed(f"feedback[{label}]", lambda: drive(
+                    lambda i: client.post("/feedback", json=notes[i], headers=headers), args.items, args.concurrency))
+            main.user_writes.max_batch = main.feedback_writes.max_batch = main.WRITE_BATCH_SIZE
+
+            requests = chunks(users("bulk"), args.bulk_size)
+            await timed("signup[bulk]", lambda: drive(
+                lambda i: client.post("/auth/signup/bulk", json=requests[i], headers=headers),
+                len(requests), args.concurrency))
+            requests = chunks(feedbacks("bulk"), args.bulk_size)
+            await timed("feedback[bulk]", lambda: drive(
+                lambda i: client.post("/feedback/bulk", json=requests[i], headers=headers),
+                len(requests), args.concurrency))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare bulk and single-item write throughput.")
+    parser.add_argument("--items", type=int, default=1000, help="accounts and feedback entries per scenario")
+    parser.add_argument("--bulk-size", type=int, default=250, help="entries per bulk request")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--password-cost", type=int, default=16,
+                        help="scrypt N; low by default so the writes, not hashing, dominate")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,97 @@
+# Offline evaluation: overlap versus TF-IDF ranking
+#
+#   cd backend && python benchmarks/compare_modes.py
+#   python benchmarks/compare_modes.py --catalog-size 5000 --top-k 5
+#   python benchmarks/compare_modes.py --profiles-file profiles.json   # list of Profile objects
+#
+# Ranks the same profiles with both scoring modes and reports how far the
+# rankings agree, how often each one has to fall back on the title to order
+# tied careers at the top-k cut, and the scoring time per profile.
+import argparse
+import json
+import os
+import time
+
+import sandbox
+
+from harness import BUILTIN_CATALOG, INVOKED_FROM, ProfileGenerator, percentile, synthetic_catalog
+
+import main
+from catalog import merge_duplicates
+from recommender import CareerIndex
+
+
+def overlap_scores(index, keywords, k):
+    return index.top(index.exact_counts(keywords), index.fuzzy_candidates(keywords), k)
+
+
+def tfidf_scores(index, keywords, k):
+    return index.top_weighted(keywords, k)
+
+
+MODES = {"overlap": overlap_scores, "tfidf": tfidf_scores}
+
+
+def tied_at_cut(ranked, k):
+    # The k-th and (k+1)-th careers score the same, so the title decides who is shown
+    return len(ranked) > k and ranked[k - 1][1] == ranked[k][1]
+
+
+def evaluate(index, profiles, k):
+    keyword_sets = [index.expand(main.profile_keywords(p)) for p in profiles]
+    rankings = {}
+    timings = {}
+    for mode, score in MODES.items():
+        rankings[mode] = []
+        timings[mode] = []
+        for keywords in keyword_sets:
+            start = time.perf_counter()
+            rankings[mode].append(score(index, keywords, k + 1))
+            timings[mode].append(time.perf_counter() - start)
+
+    agree_top1 = overlap_at_k = 0
+    for a, b in zip(rankings["overlap"], rankings["tfidf"]):
+        top_a = [career_id for career_id, _ in a[:k]]
+        top_b = [career_id for career_id, _ in b[:k]]
+        agree_top1 += bool(top_a and top_b and top_a[0] == top_b[0])
+        overlap_at_k += len(set(top_a) & set(top_b)) / k
+
+    n = len(profiles)
+    report = {
+        "profiles": n,
+        "top1_agreement": agree_top1 / n,
+        f"overlap@{k}": overlap_at_k / n,
+    }
+    for mode in MODES:
+        report[f"{mode}_ties_at_cut"] = sum(tied_at_cut(r, k) for r in rankings[mode]) / n
+        report[f"{mode}_p50_ms"] = percentile(timings[mode], 0.5) * 1e3
+        report[f"{mode}_p95_ms"] = percentile(timings[mode], 0.95) * 1e3
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare overlap and TF-IDF rankings on the same profiles.")
+    parser.add_argument("--catalog-size", type=int, default=0, help="synthetic careers added to the built-in catalog")
+    parser.add_argument("--profiles", type=int, default=500, help="synthetic profiles per profile size")
+    parser.add_argument("--profile-sizes", type=int, nargs="+", default=[3, 10, 30])
+    parser.add_argument("--profiles-file", help="JSON list of profiles to use instead of synthetic ones")
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    catalog = synthetic_catalog(args.catalog_size) if args.catalog_size else BUILTIN_CATALOG
+    index = CareerIndex(merge_duplicates(catalog), main.current_career_index().synonym_groups)
+    if args.profiles_file:
+        with open(os.path.join(INVOKED_FROM, args.profiles_file), encoding="utf-8") as f:
+            datasets = {"file": [main.Profile(**p) for p in json.load(f)]}
+    else:
+        datasets = {}
+        for size in args.profile_sizes:
+            generate = ProfileGenerator(size, seed=size)
+            datasets[f"profile={size}"] = [main.Profile(**generate("eval")) for _ in range(args.profiles)]
+
+    print(f"catalog: {len(index.careers)} careers, top_k={args.top_k}")
+    for name, profiles in datasets.items():
+        report = evaluate(index, profiles, args.top_k)
+        print(name)
+        for metric, value in report.items():
+            print(f"  {metric:<24} {value:.3f}" if isinstance(value, float) else f"  {metric:<24} {value}")
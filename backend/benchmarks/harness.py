@@ -0,0 +1,261 @@
+# Benchmark harness for the prediction and auth endpoints
+#
+#   cd backend && python benchmarks/harness.py                      # print a report
+#   python benchmarks/harness.py --save benchmarks/baselines/local.json
+#   python benchmarks/harness.py --compare benchmarks/baselines/local.json
+#
+# Drives the FastAPI app in-process over an ASGI transport (no network) with
+# synthetic users and profiles, for every combination of catalog size and
+# profile size given. Reports throughput and p50/p95/p99 latency per scenario.
+# --compare exits non-zero when a scenario is slower than the baseline by more
+# than --tolerance; baselines are machine-specific, so record them on the
+# machine that runs the comparison.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import string
+import sys
+import time
+
+from sandbox import INVOKED_FROM
+
+import httpx
+
+import main
+
+EDUCATION = ["High School", "Associate Degree", "Bachelor's Degree", "Master's Degree", "PhD", "Other"]
+PERSONALITY = ["curious", "creative", "introvert", "outgoing", "analytical", "patient", "organized"]
+BUILTIN_CATALOG = [career.to_dict() for career in main.current_career_index().careers]
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(latencies, elapsed):
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1e3,
+        "p95_ms": percentile(latencies, 0.95) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+    }
+
+
+def base_vocabulary():
+    terms = {s.lower() for c in BUILTIN_CATALOG for s in c["skills"]}
+    for key, syns in main.current_career_index().synonym_groups.items():
+        terms.add(key)
+        terms.update(syns)
+    return sorted(terms)
+
+
+def synthetic_word(rng):
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 11)))
+
+
+def synthetic_catalog(size, seed=0):
+    # Built-in careers plus generated ones drawing on the real vocabulary and
+    # an invented one of similar size, so postings and fuzzy candidates grow
+    rng = random.Random(seed)
+    vocabulary = base_vocabulary()
+    invented = [synthetic_word(rng) for _ in range(max(50, size // 4))]
+    catalog = list(BUILTIN_CATALOG)
+    for i in range(size):
+        skills = rng.sample(vocabulary, rng.randint(3, 6)) + rng.sample(invented, rng.randint(1, 3))
+        catalog.append({
+            "title": f"Occupation {i:05d}",
+            "skills": skills,
+            "description": f"Synthetic occupation {i}.",
+            "roadmap": ["Learn the basics", "Build experience", "Apply for roles"],
+        })
+    return catalog
+
+
+class ProfileGenerator:
+    """Profiles with `size` skills and `size` interests, mostly real terms with some noise."""
+
+    def __init__(self, size, seed=0):
+        self.size = size
+        self.rng = random.Random(seed)
+        self.vocabulary = base_vocabulary()
+
+    def term(self):
+        rng = self.rng
+        roll = rng.random()
+        if roll < 0.7:
+            return rng.choice(self.vocabulary)
+        if roll < 0.85:
+            # typo of a real term, exercising the fuzzy matcher
+            word = rng.choice(self.vocabulary)
+            i = rng.randrange(len(word))
+            return word[:i] + word[i + 1:]
+        return synthetic_word(rng)
+
+    def __call__(self, user_id):
+        rng = self.rng
+        return {
+            "user_id": user_id,
+            "skills": [self.term() for _ in range(self.size)],
+            "education": rng.choice(EDUCATION),
+            "interests": [self.term() for _ in range(self.size)],
+            "personality": rng.choice(PERSONALITY),
+            "goals": " ".join(self.term() for _ in range(rng.randint(2, 8))),
+        }
+
+
+async def drive(make_request, count, concurrency):
+    latencies = []
+    counter = iter(range(count))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            response = await make_request(i)
+            latencies.append(time.perf_counter() - start)
+            if response is not None and response.status_code >= 400:
+                raise RuntimeError(f"{response.request.url}: {response.status_code} {response.text}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def score_directly(profiles):
+    # get_career_recommendation_content_based without HTTP or the result cache
+    latencies = []
+    start = time.perf_counter()
+    for profile in profiles:
+        t = time.perf_counter()
+        main.get_career_recommendation_content_based(profile)
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def run(args):
+    results = {}
+    run_id = f"{time.time_ns():x}"
+    if args.password_cost:
+        main.PASSWORD_COST = args.password_cost
+
+    async def report(name, scenario):
+        # Best of --repeat runs, which keeps noisy neighbours out of the baseline
+        runs = []
+        for rep in range(args.repeat):
+            runs.append(await scenario(rep))
+        summary = results[name] = min(runs, key=lambda r: r["p50_ms"])
+        print(
+            f"{name:<36} {summary['throughput']:10.1f} {summary['p50_ms']:8.2f} "
+            f"{summary['p95_ms']:8.2f} {summary['p99_ms']:8.2f}"
+        )
+
+    print(f"{'scenario':<36} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            n = args.auth_requests
+            await report("signup", lambda rep: drive(
+                lambda i: client.post("/auth/signup", json={"username": f"{run_id}-{rep}-{i}", "password": "bench"}),
+                n, args.concurrency,
+            ))
+            await report("token", lambda rep: drive(
+                lambda i: client.post("/auth/token", data={"username": f"{run_id}-0-{i}", "password": "bench"}),
+                n, args.concurrency,
+            ))
+            token = (await client.post(
+                "/auth/token", data={"username": f"{run_id}-0-0", "password": "bench"}
+            )).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            original = main.current_career_index()
+            try:
+                for catalog_size in args.catalog_sizes:
+                    index = main.rebuild_career_index(synthetic_catalog(catalog_size))
+                    for profile_size in args.profile_sizes:
+                        label = f"catalog={len(index.careers)},profile={profile_size}"
+                        generate = ProfileGenerator(profile_size, seed=profile_size)
+                        await report(f"predict[{label}]", lambda rep: drive(
+                            lambda i: client.post(
+                                "/predict-career-content-based", json=generate(f"{run_id}-{i}"), headers=headers
+                            ),
+                            args.requests, args.concurrency,
+                        ))
+
+                        async def score(rep):
+                            profiles = [main.Profile(**generate("direct")) for _ in range(args.requests)]
+                            cache_size = main.prediction_cache.maxsize
+                            main.prediction_cache.maxsize = 0
+                            try:
+                                return score_directly(profiles)
+                            finally:
+                                main.prediction_cache.maxsize = cache_size
+
+                        await report(f"score[{label}]", score)
+            finally:
+                main.install_career_index(original)
+
+            await report("results", lambda rep: drive(
+                lambda i: client.get(f"/results/{run_id}-{i % args.requests}", headers=headers),
+                args.requests, args.concurrency,
+            ))
+            await report("feedback", lambda rep: drive(
+                lambda i: client.post("/feedback", json={"user_id": run_id, "feedback": f"note {i}"}, headers=headers),
+                args.requests, args.concurrency,
+            ))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, base in baseline["results"].items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if current["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {current['p50_ms']:.2f}ms vs baseline {base['p50_ms']:.2f}ms")
+        if current["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {current['throughput']:.1f} req/s vs baseline {base['throughput']:.1f} req/s"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the prediction and auth endpoints in-process.")
+    parser.add_argument("--requests", type=int, default=300, help="requests per prediction/results/feedback scenario")
+    parser.add_argument("--auth-requests", type=int, default=50, help="requests for signup and token")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario; the best one is kept")
+    parser.add_argument("--catalog-sizes", type=int, nargs="+", default=[0, 1000],
+                        help="synthetic careers added to the built-in catalog")
+    parser.add_argument("--profile-sizes", type=int, nargs="+", default=[3, 10, 30],
+                        help="skills and interests per profile")
+    parser.add_argument("--password-cost", type=int, default=None, help="override PASSWORD_SCRYPT_N")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="fail if slower than this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown for --compare")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    if args.save:
+        with open(os.path.join(INVOKED_FROM, args.save), "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cpus": os.cpu_count(),
+                    "args": {k: v for k, v in vars(args).items() if k not in ("save", "compare")},
+                },
+                "results": results,
+            }, f, indent=2)
+    if args.compare:
+        with open(os.path.join(INVOKED_FROM, args.compare), encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        sys.exit(1 if regressions else 0)
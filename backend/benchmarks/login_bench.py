@@ -0,0 +1,76 @@
+# Benchmark: login throughput and event-loop responsiveness versus scrypt cost
+#
+#   cd backend && python benchmarks/login_bench.py --costs 1024 4096 16384 --logins 200
+#
+# For each cost, fires concurrent /auth/token requests in-process over an ASGI
+# transport and reports logins/s, login latency, and the latency of a trivial
+# endpoint (/) measured during the burst.
+import argparse
+import asyncio
+import time
+
+import sandbox
+
+import httpx
+
+import main
+from harness import percentile
+
+
+async def burst(client, username, logins, concurrency):
+    queue = asyncio.Queue()
+    for _ in range(logins):
+        queue.put_nowait(None)
+    latencies = []
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.post("/auth/token", data={"username": username, "password": "bench"})
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies
+
+
+async def probe(client, done):
+    samples = []
+    while not done.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0.001)
+    return samples
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'cost N':>8} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'/ p99 ms':>9}")
+        for cost in args.costs:
+            main.PASSWORD_COST = cost
+            username = f"bench{cost}"
+            await client.post("/auth/signup", json={"username": username, "password": "bench"})
+
+            done = asyncio.Event()
+            probe_task = asyncio.create_task(probe(client, done))
+            elapsed, latencies = await burst(client, username, args.logins, args.concurrency)
+            done.set()
+            probe_samples = await probe_task
+
+            print(
+                f"{cost:>8} {args.logins / elapsed:9.1f} "
+                f"{percentile(latencies, 0.5) * 1e3:8.2f} {percentile(latencies, 0.99) * 1e3:8.2f} "
+                f"{percentile(probe_samples, 0.99) * 1e3:9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--costs", type=int, nargs="+", default=[1024, 4096, 16384, 32768])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    asyncio.run(run(parser.parse_args()))
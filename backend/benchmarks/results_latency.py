@@ -0,0 +1,80 @@
+# Load test: latency of /results/{user_id} while predictions are being scored
+#
+#   cd backend && python benchmarks/results_latency.py --concurrency 8
+#
+# Drives the app in-process over an ASGI transport and prints p50/p99 of the
+# read endpoint on its own and with prediction requests running alongside.
+import argparse
+import asyncio
+import random
+import string
+import time
+
+import sandbox
+
+import httpx
+
+import main
+from harness import percentile
+
+
+def random_profile(user_id):
+    # Fresh free-text words every time so the fuzzy caches cannot absorb the work
+    words = ["".join(random.choices(string.ascii_lowercase, k=random.randint(4, 12))) for _ in range(40)]
+    return {
+        "user_id": user_id,
+        "skills": random.sample(["programming", "math", "design", "communication", "research"], 3) + words[:20],
+        "education": "Bachelor's Degree",
+        "interests": words[20:],
+        "personality": "curious",
+        "goals": " ".join(words),
+    }
+
+
+async def probe(client, headers, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await client.get("/results/bench", headers=headers)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+        await asyncio.sleep(0)
+    return samples
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/auth/signup", json={"username": "bench", "password": "bench"})
+        token = (await client.post("/auth/token", data={"username": "bench", "password": "bench"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        await client.post("/predict-career-content-based", json=random_profile("bench"), headers=headers)
+
+        idle = await probe(client, headers, args.requests)
+
+        stop = asyncio.Event()
+        scored = 0
+
+        async def predictor(n):
+            nonlocal scored
+            while not stop.is_set():
+                await client.post("/predict-career-content-based", json=random_profile(f"load{n}"), headers=headers)
+                scored += 1
+
+        tasks = [asyncio.create_task(predictor(n)) for n in range(args.concurrency)]
+        await asyncio.sleep(0.1)
+        loaded = await probe(client, headers, args.requests)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    print(f"{'':>22} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, samples in (("idle", idle), (f"{args.concurrency} predictors", loaded)):
+        print(f"{label:>22} {percentile(samples, 0.5) * 1e3:8.2f} {percentile(samples, 0.99) * 1e3:8.2f}")
+    print(f"predictions scored during the loaded run: {scored}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    asyncio.run(run(parser.parse_args()))
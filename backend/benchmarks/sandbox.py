@@ -0,0 +1,15 @@
+# Common set-up for the benchmark scripts; import it before `main`
+#
+# Puts the backend on the import path, moves into a scratch directory so the
+# benchmark's database stays away from real data, and turns the per-user rate
+# limits off so the endpoints, not the limits, are measured. Paths given on
+# the command line are relative to INVOKED_FROM.
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+INVOKED_FROM = os.getcwd()
+os.chdir(tempfile.mkdtemp())
+os.environ.setdefault("PREDICT_RATE", "0")
+os.environ.setdefault("LOGIN_RATE", "0")
@@ -0,0 +1,65 @@
+# Benchmark: incremental session re-scoring versus a full recompute per edit
+#
+#   cd backend && python benchmarks/session_bench.py
+#   python benchmarks/session_bench.py --catalog-sizes 1000 10000 --edits 500
+#
+# Simulates users editing their profile one skill or interest at a time.
+# After every edit the profile is ranked both from scratch (prediction cache
+# off) and through its scoring session; the script reports the time per edit
+# for each and how many rankings differed, which should be none.
+import argparse
+import random
+import time
+
+import sandbox
+
+from harness import ProfileGenerator, percentile, synthetic_catalog
+
+import main
+
+
+def edits(generate, rng, count):
+    # One profile, then `count` single-keyword changes to it
+    profile = generate("session")
+    for _ in range(count):
+        field = rng.choice(["skills", "interests"])
+        values = list(profile[field])
+        if len(values) > 1 and rng.random() < 0.5:
+            values.pop(rng.randrange(len(values)))
+        else:
+            values.append(generate.term())
+        profile = dict(profile, **{field: values})
+        yield main.Profile(**profile)
+
+
+def run(args):
+    print(f"{'catalog':>8} {'full p50 ms':>12} {'full p95 ms':>12} {'session p50 ms':>15} {'session p95 ms':>15} {'mismatches':>11}")
+    main.prediction_cache.maxsize = 0
+    for size in args.catalog_sizes:
+        index = main.rebuild_career_index(synthetic_catalog(size))
+        full, incremental, mismatches = [], [], 0
+        for user in range(args.users):
+            rng = random.Random(user)
+            for profile in edits(ProfileGenerator(args.profile_size, seed=user), rng, args.edits):
+                start = time.perf_counter()
+                expected = main.get_career_recommendation_content_based(profile, args.top_k)
+                full.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                got = main.rescore_session(f"user{user}", profile, args.top_k)
+                incremental.append(time.perf_counter() - start)
+                mismatches += got != expected
+        print(
+            f"{len(index.careers):>8} {percentile(full, 0.5) * 1e3:12.3f} {percentile(full, 0.95) * 1e3:12.3f} "
+            f"{percentile(incremental, 0.5) * 1e3:15.3f} {percentile(incremental, 0.95) * 1e3:15.3f} {mismatches:>11}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare session re-scoring with full recomputes.")
+    parser.add_argument("--catalog-sizes", type=int, nargs="+", default=[0, 1000, 10000],
+                        help="synthetic careers added to the built-in catalog")
+    parser.add_argument("--users", type=int, default=20, help="independent editing sessions")
+    parser.add_argument("--edits", type=int, default=50, help="single-keyword edits per session")
+    parser.add_argument("--profile-size", type=int, default=5, help="skills and interests to start from")
+    parser.add_argument("--top-k", type=int, default=3)
+    run(parser.parse_args())
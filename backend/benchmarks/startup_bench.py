@@ -0,0 +1,106 @@
+# Benchmark: worker start-up time and memory as the career catalog grows
+#
+#   cd backend && python benchmarks/startup_bench.py
+#   python benchmarks/startup_bench.py --catalog-sizes 0 1000 10000 --repeat 3
+#
+# Every measurement is a fresh interpreter, like a new uvicorn worker: it times
+# `import main`, then the app's lifespan start-up (state store, career index),
+# and reports resident memory once started. "cold" starts have to build the
+# compiled catalog index, "warm" ones load the copy the cold start left behind.
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import sandbox
+
+
+def rss_mb():
+    # Current resident set size; Linux only, falls back to the peak elsewhere
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def measure_worker():
+    # Runs in the child process; prints one JSON line
+    before = rss_mb()
+    start = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+    after_import = rss_mb()
+
+    async def startup():
+        async with main.app.router.lifespan_context(main.app):
+            pass
+
+    asyncio.run(startup())
+    started = time.perf_counter()
+    print(json.dumps({
+        "import_s": imported - start,
+        "startup_s": started - imported,
+        "careers": len(main.career_index.careers),
+        "import_mb": after_import - before if before is not None else None,
+        "rss_mb": rss_mb(),
+    }))
+
+
+def spawn(catalog_file, workdir):
+    env = dict(os.environ, CATALOG_FILE=catalog_file, STATE_DB=os.path.join(workdir, "state.db"))
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker"],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def write_catalog(path, size):
+    # The harness imports main, so only the parent process pays for it
+    import main
+    from harness import BUILTIN_CATALOG, synthetic_catalog
+    careers = synthetic_catalog(size) if size else BUILTIN_CATALOG
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"careers": careers, "synonyms": main.current_career_index().synonym_groups}, f)
+
+
+def fmt(value, spec):
+    return format(value, spec) if value is not None else "n/a".rjust(int(spec.split(".")[0]))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--worker"]:
+        measure_worker()
+        sys.exit()
+
+    parser = argparse.ArgumentParser(description="Measure worker import time, start-up time and memory.")
+    parser.add_argument("--catalog-sizes", type=int, nargs="+", default=[0, 1000, 5000],
+                        help="synthetic careers added to the built-in catalog")
+    parser.add_argument("--repeat", type=int, default=3, help="warm starts per size; the fastest one is kept")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<24} {'careers':>8} {'import s':>9} {'start s':>8} {'import MB':>10} {'RSS MB':>8}")
+    for size in args.catalog_sizes:
+        workdir = tempfile.mkdtemp()
+        catalog_file = os.path.join(workdir, "careers.json")
+        write_catalog(catalog_file, size)
+        cold = spawn(catalog_file, workdir)
+        warm = min((spawn(catalog_file, workdir) for _ in range(args.repeat)), key=lambda r: r["startup_s"])
+        for label, r in (("cold", cold), ("warm", warm)):
+            print(
+                f"{f'{label}[catalog={size}]':<24} {r['careers']:>8} {r['import_s']:9.3f} {r['startup_s']:8.3f} "
+                f"{fmt(r['import_mb'], '10.1f')} {fmt(r['rss_mb'], '8.1f')}"
+            )
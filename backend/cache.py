@@ -0,0 +1,108 @@
+# Bounded LRU cache with optional expiry and hit/miss/eviction counters, and
+# single-flight sharing of in-progress computations
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU cache; entries older than `ttl` seconds count as misses."""
+
+    def __init__(self, maxsize=4096, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > self.clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.evictions += 1
+            self.misses += 1
+            return default
+
+    def pop(self, key, default=MISSING):
+        # Removes the entry and returns its value, counted like get()
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > self.clock():
+                    self.hits += 1
+                    return value
+                self.evictions += 1
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        # `ttl` overrides the cache-wide expiry for this entry
+        ttl = self.ttl if ttl is None else ttl
+        expires = None if ttl is None else self.clock() + ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.evictions += len(self._data)
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one computation.
+
+    The first caller starts `func(*args)` as a task; callers arriving while it
+    runs await the same task. A caller that goes away does not cancel the work
+    the others are waiting for. Event-loop only, so no lock.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls = {}
+
+    async def run(self, key, func, *args):
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(func(*args))
+
+            def forget(done):
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+
+            task.add_done_callback(forget)
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def __len__(self):
+        return len(self._calls)
@@ -0,0 +1,155 @@
+# Career catalog loading: de-duplication, a compiled on-disk index and change detection
+import hashlib
+import json
+import marshal
+import os
+import tempfile
+import threading
+import time
+
+from recommender import CareerIndex
+
+# Bump whenever CareerIndex.to_state() changes shape; older compiled files are rebuilt
+FORMAT_VERSION = 5
+COMPILED_SUFFIX = ".idx"
+REQUIRED_FIELDS = {"title", "skills", "description", "roadmap"}
+
+
+def merge_duplicates(careers):
+    """Collapse careers sharing a title (case-insensitive) into the first occurrence.
+
+    Skills are unioned in order of appearance; any other field missing from the
+    first entry is taken from a later one.
+    """
+    merged = {}
+    for career in careers:
+        key = career["title"].strip().lower()
+        first = merged.get(key)
+        if first is None:
+            merged[key] = dict(career, skills=list(career["skills"]))
+            continue
+        seen = {s.lower() for s in first["skills"]}
+        for skill in career["skills"]:
+            if skill.lower() not in seen:
+                seen.add(skill.lower())
+                first["skills"].append(skill)
+        for field, value in career.items():
+            if not first.get(field):
+                first[field] = value
+    return list(merged.values())
+
+
+class CatalogError(ValueError):
+    pass
+
+
+def parse_catalog(source):
+    try:
+        data = json.loads(source)
+        careers, synonyms = data["careers"], data.get("synonyms", {})
+        incomplete = [career.get("title") for career in careers if not REQUIRED_FIELDS <= career.keys()]
+    except (ValueError, KeyError, TypeError, AttributeError) as exc:
+        raise CatalogError(f"malformed catalog: {exc!r}") from exc
+    if incomplete:
+        raise CatalogError(f"careers without {', '.join(sorted(REQUIRED_FIELDS))}: {incomplete}")
+    return merge_duplicates(careers), synonyms
+
+
+def build_index(careers, synonyms):
+    # CareerIndex plus its related-careers table, which every catalog version carries.
+    # batch_scoring pulls in numpy, so it is imported once a catalog is actually loaded
+    from batch_scoring import RelatedCareers
+    index = CareerIndex(careers, synonyms)
+    index.related = RelatedCareers.build(index)
+    return index
+
+
+def _read_compiled(path, digest):
+    try:
+        with open(path, "rb") as f:
+            # loads() on the whole buffer is several times faster than load(f)
+            version, source_digest, state = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != FORMAT_VERSION or source_digest != digest:
+        return None
+    return state
+
+
+def _write_compiled(path, digest, state):
+    # Written next to the catalog and renamed into place, so readers never see
+    # a partial file; a read-only data directory just means no compiled copy
+    try:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".careers-", suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(marshal.dumps((FORMAT_VERSION, digest, state)))
+        os.replace(tmp, path)
+    except OSError:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def load_index(path):
+    """CareerIndex for the JSON catalog at `path`.
+
+    The built index is cached in `path + ".idx"` keyed on a hash of the JSON
+    source, so workers starting against an unchanged catalog skip parsing,
+    merging and index construction.
+    """
+    with open(path, "rb") as f:
+        source = f.read()
+    digest = hashlib.sha256(source).hexdigest()
+    compiled = path + COMPILED_SUFFIX
+    state = _read_compiled(compiled, digest)
+    if state is not None:
+        from batch_scoring import RelatedCareers
+        index = CareerIndex.from_state(state["index"])
+        index.related = RelatedCareers.from_state(state["related"])
+        return index
+    index = build_index(*parse_catalog(source))
+    _write_compiled(compiled, digest, {"index": index.to_state(), "related": index.related.to_state()})
+    return index
+
+
+class CatalogWatcher:
+    """Notices edits to the catalog file, checking its mtime and size at most every `interval` seconds."""
+
+    def __init__(self, path, interval=5.0, clock=time.monotonic):
+        self.path = path
+        self.interval = interval
+        self.clock = clock
+        self._signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def load(self):
+        signature = self._stat()
+        index = load_index(self.path)
+        with self._lock:
+            self._signature = signature
+            self._next_check = self.clock() + self.interval
+        return index
+
+    def changed(self):
+        # True for exactly one caller per change, which is then expected to reload;
+        # a missing file is not a change, the current catalog stays in use
+        now = self.clock()
+        with self._lock:
+            if now < self._next_check:
+                return False
+            self._next_check = now + self.interval
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                return False
+            self._signature = signature
+            return True
@@ -0,0 +1,32 @@
+# Streaming NDJSON export of stored records
+import json
+import zlib
+
+from starlette.concurrency import run_in_threadpool
+
+# Records fetched per store query; bounds memory and how long the store is busy per chunk
+EXPORT_CHUNK_SIZE = 500
+
+
+async def ndjson_chunks(fetch, after=0, chunk_size=EXPORT_CHUNK_SIZE):
+    """NDJSON lines for everything `fetch(after, limit)` returns past the cursor `after`.
+
+    Each record carries its own `cursor`; a client that is cut off resumes by
+    passing the last cursor it received.
+    """
+    while True:
+        rows = await run_in_threadpool(fetch, after, chunk_size)
+        if not rows:
+            return
+        yield "".join(json.dumps(row) + "\n" for row in rows).encode()
+        if len(rows) < chunk_size:
+            return
+        after = rows[-1]["cursor"]
+
+
+async def gzip_chunks(chunks, level=6):
+    # Each chunk is flushed as it is produced, so clients can decode while the export runs
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
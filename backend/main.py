@@ -1,21 +1,87 @@
 
 # Career Prediction Backend (FastAPI + MongoDB + JWT)
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Body, Depends, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 
-import threading
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from jose import JWTError, jwt
 import os
-from dotenv import load_dotenv
-import requests
-import json
-
-load_dotenv()
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Literal, Optional
+
+from cache import LRUCache, SingleFlight
+from catalog import CatalogWatcher, build_index, load_index, merge_duplicates
+from export import gzip_chunks, ndjson_chunks
+from metrics import Gauge, Histogram, MetricsMiddleware, Registry
+from passwords import DEFAULT_COST, dummy_hash, hash_password, needs_rehash, verify_password
+from profiler import SlowRequestProfiler
+from ratelimit import TokenBucketLimiter
+from recommender import RELATED_CAREERS, ScoringSession
+from storage import MAX_FEEDBACKS, MAX_HISTORY, MAX_PREDICTIONS, make_store
+from writebehind import GroupCommitQueue
+
+# Settings may come from a .env next to this file; python-dotenv is only imported if there is one
+ENV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+if os.path.exists(ENV_FILE):
+    from dotenv import load_dotenv
+    load_dotenv(ENV_FILE)
+
+# Importing this module only wires up the app. The state store, the career
+# index and the profiler are started by the lifespan below (or on first use),
+# so workers, tests and tools that just import `app` don't pay for them.
+@asynccontextmanager
+async def lifespan(app):
+    get_store()
+    current_career_index()
+    if profiler is not None:
+        profiler.start()
+    try:
+        yield
+    finally:
+        # Queued writes are committed before the worker exits
+        await user_writes.close()
+        await feedback_writes.close()
+        if profiler is not None:
+            profiler.stop()
+
+app = FastAPI(lifespan=lifespan)
+logger = logging.getLogger("uvicorn.error")
+
+# Metrics, served in Prometheus text format at /metrics
+registry = Registry()
+REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route", "status")))
+PHASE_SECONDS = registry.register(Histogram(
+    "recommender_phase_seconds", "Time spent in each phase of the content-based recommender.", ("phase",)))
+POOL_WAIT_SECONDS = registry.register(Histogram(
+    "executor_queue_wait_seconds", "Time a job waited for a free worker thread.", ("pool",)))
+STORE_WRITE_SECONDS = registry.register(Histogram(
+    "store_write_seconds", "Duration of state store writes.", ("op",)))
+
+# Opt-in: PROFILE_SLOW_REQUESTS_MS=250 dumps collapsed stacks of slower requests to PROFILE_DIR
+profiler = None
+if os.getenv("PROFILE_SLOW_REQUESTS_MS"):
+    profiler = SlowRequestProfiler(
+        threshold=float(os.getenv("PROFILE_SLOW_REQUESTS_MS")) / 1000,
+        directory=os.getenv("PROFILE_DIR", "profiles"),
+    )
 
-app = FastAPI()
+app.add_middleware(
+    MetricsMiddleware,
+    histogram=REQUEST_SECONDS,
+    on_finish=profiler.request_finished if profiler else None,
+)
 
 # Root endpoint
 @app.get("/")
@@ -33,27 +99,109 @@ app.add_middleware(
 
 
 
-# Persistent user storage in users.json
+# Users, predictions and feedback live in a shared state backend so every
+# worker sees the same data: "sqlite" (default) or process-local "memory".
+# users.json is imported once into an empty store.
 USERS_FILE = "users.json"
-def load_users():
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-def save_users(users):
-    with open(USERS_FILE, "w", encoding="utf-8") as f:
-        json.dump(users, f)
-
-users = load_users()
-predictions = {}
-feedbacks = []
-lock = threading.Lock()
+STATE_BACKEND = os.getenv("STATE_BACKEND", "sqlite")
+STATE_DB = os.getenv("STATE_DB", "state.db")
+
+store = None
+
+def get_store():
+    # Opened by the lifespan; only ever called from the event loop, so no lock
+    global store
+    if store is None:
+        store = make_store(
+            STATE_BACKEND,
+            STATE_DB,
+            max_predictions=int(os.getenv("MAX_PREDICTIONS", MAX_PREDICTIONS)),
+            max_feedbacks=int(os.getenv("MAX_FEEDBACKS", MAX_FEEDBACKS)),
+            max_history=int(os.getenv("MAX_HISTORY", MAX_HISTORY)),
+        )
+        store.import_json(USERS_FILE, PASSWORD_COST)
+    return store
+
+# CPU-bound scoring runs on a bounded pool so the event loop keeps serving requests.
+# Threads share the index and caches; processes also sidestep the GIL.
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", str(min(4, os.cpu_count() or 1))))
+if os.getenv("SCORING_EXECUTOR", "thread") == "process":
+    scoring_pool = ProcessPoolExecutor(max_workers=SCORING_WORKERS)
+else:
+    scoring_pool = ThreadPoolExecutor(max_workers=SCORING_WORKERS, thread_name_prefix="scoring")
+
+def _timed_job(pool, submitted, func, *args):
+    POOL_WAIT_SECONDS.observe(time.perf_counter() - submitted, pool)
+    return func(*args)
+
+async def run_in_pool(executor, name, func, *args):
+    # Queue wait is only observable for threads; process workers have their own registry
+    if isinstance(executor, ThreadPoolExecutor):
+        args = (name, time.perf_counter(), func) + args
+        func = _timed_job
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+async def run_scoring(func, *args):
+    return await run_in_pool(scoring_pool, "scoring", func, *args)
+
+async def store_write(op, func, *args):
+    # State store writes block on disk, so they run in the threadpool
+    def timed():
+        with STORE_WRITE_SECONDS.time(op):
+            return func(*args)
+    return await run_in_threadpool(timed)
+
+# Signups and feedback are group-committed: writes arriving within
+# WRITE_BATCH_INTERVAL_MS of each other share one transaction, up to
+# WRITE_BATCH_SIZE per batch. Signups wait for their commit; feedback is
+# acknowledged once queued, and the lifespan flushes the queue on shutdown.
+WRITE_BATCH_INTERVAL = float(os.getenv("WRITE_BATCH_INTERVAL_MS", "10")) / 1000
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "500"))
+
+async def commit_users(users):
+    return await store_write("add_users", get_store().add_users, users)
+
+async def commit_feedbacks(feedbacks):
+    await store_write("add_feedbacks", get_store().add_feedbacks, feedbacks)
+    return [None] * len(feedbacks)
+
+user_writes = GroupCommitQueue(commit_users, WRITE_BATCH_INTERVAL, WRITE_BATCH_SIZE)
+feedback_writes = GroupCommitQueue(commit_feedbacks, WRITE_BATCH_INTERVAL, WRITE_BATCH_SIZE)
+
+# Password hashing is deliberately slow; a small dedicated pool keeps a login
+# burst from starving the event loop or the scoring pool
+PASSWORD_COST = int(os.getenv("PASSWORD_SCRYPT_N", DEFAULT_COST))
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="hashing")
+
+async def run_hashing(func, *args):
+    return await run_in_pool(hash_pool, "hashing", func, *args)
 
 # JWT
 SECRET_KEY = os.getenv("JWT_SECRET", "secret")
 ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
+# Verified tokens by SHA-256 digest -> username; entries expire with the token.
+# Tokens issued before exp/iat were added stay valid, cached for at most the cap.
+TOKEN_CACHE_MAX_TTL = 300
+token_cache = LRUCache(maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "10000")), ttl=TOKEN_CACHE_MAX_TTL)
+
+# Per-user token buckets in front of scoring and login: *_RATE requests per
+# second with bursts of *_BURST; a rate of 0 turns the limit off. Logins are
+# counted per submitted username, predictions per authenticated user.
+RATE_LIMIT_USERS = int(os.getenv("RATE_LIMIT_USERS", "100000"))
+predict_limiter = TokenBucketLimiter(
+    float(os.getenv("PREDICT_RATE", "1")), float(os.getenv("PREDICT_BURST", "10")), RATE_LIMIT_USERS)
+login_limiter = TokenBucketLimiter(
+    float(os.getenv("LOGIN_RATE", "0.2")), float(os.getenv("LOGIN_BURST", "5")), RATE_LIMIT_USERS)
+
+def enforce_rate_limit(limiter, key):
+    wait = limiter.acquire(key)
+    if wait:
+        raise HTTPException(status_code=429, detail="Too many requests", headers={"Retry-After": str(math.ceil(wait))})
+
 # Models
 class User(BaseModel):
     username: str
@@ -79,42 +227,100 @@ class Feedback(BaseModel):
 
 # Auth utils
 async def authenticate_user(username: str, password: str):
-    with lock:
-        user = users.get(username)
-        if user and user["password"] == password:
-            return user
-    return None
+    user = await run_in_threadpool(get_store().get_user, username)
+    # Unknown usernames are checked against a dummy hash, so response times
+    # don't reveal which accounts exist
+    stored = user["password"] if user else dummy_hash(PASSWORD_COST)
+    if not await run_hashing(verify_password, password, stored) or not user:
+        return None
+    # Plaintext entries and hashes made with an older cost are upgraded in place
+    if needs_rehash(user["password"], PASSWORD_COST):
+        hashed = await run_hashing(hash_password, password, PASSWORD_COST)
+        await store_write("set_password", get_store().set_password, username, hashed)
+    return user
 
 def create_access_token(data: dict):
-    return jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
-
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+    now = int(time.time())
+    claims = dict(data, iat=now, exp=now + ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+def verify_token(token: str):
+    # Username for a valid token; full signature check only on a cache miss
+    key = hashlib.sha256(token.encode()).digest()
+    username = token_cache.get(key, None)
+    if username is not None:
+        return username
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Invalid credentials")
-        with lock:
-            user = users.get(username)
-            if user is None:
-                raise HTTPException(status_code=401, detail="User not found")
-            return user
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    username = payload.get("sub")
+    if username is None:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    exp = payload.get("exp")
+    ttl = TOKEN_CACHE_MAX_TTL if exp is None else min(TOKEN_CACHE_MAX_TTL, exp - time.time())
+    if ttl > 0:
+        token_cache.set(key, username, ttl=ttl)
+    return username
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    username = verify_token(token)
+    # Store reads can wait on a locked SQLite database, so like every other
+    # store call they run in the threadpool rather than on the event loop
+    user = await run_in_threadpool(get_store().get_user, username)
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+async def prediction_user(user=Depends(get_current_user)):
+    enforce_rate_limit(predict_limiter, user["username"])
+    return user
+
+# Admins are listed by username in ADMIN_USERS (comma-separated)
+ADMIN_USERS = {name.strip() for name in os.getenv("ADMIN_USERS", "").split(",") if name.strip()}
+
+async def require_admin(user=Depends(get_current_user)):
+    if user["username"] not in ADMIN_USERS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
+
+def owns_account(user, user_id):
+    # A user's history and favorites are theirs and the admins' only
+    return user_id == user["username"] or user["username"] in ADMIN_USERS
+
+async def require_account_owner(user_id: str, user=Depends(get_current_user)):
+    # Per-user data in the path is only served to that user (or an admin)
+    if not owns_account(user, user_id):
+        raise HTTPException(status_code=403, detail="Not allowed to access another user's data")
+    return user
 
 # Auth endpoints
 
 @app.post("/auth/signup")
 async def signup(user: User):
-    with lock:
-        if user.username in users:
-            raise HTTPException(status_code=400, detail="Username exists")
-        users[user.username] = user.dict()
-        save_users(users)
+    hashed = await run_hashing(hash_password, user.password, PASSWORD_COST)
+    if not await user_writes.submit({"username": user.username, "password": hashed}):
+        raise HTTPException(status_code=400, detail="Username exists")
     return {"msg": "User created"}
 
+# Bulk and batch endpoints take at most MAX_BULK_ITEMS entries per request
+MAX_BULK_ITEMS = int(os.getenv("MAX_BULK_ITEMS", "1000"))
+
+# Accounts for a whole class at once; usernames already taken are reported, not fatal
+@app.post("/auth/signup/bulk")
+async def signup_bulk(users: list[User] = Body(..., max_length=MAX_BULK_ITEMS), admin=Depends(require_admin)):
+    hashes = await asyncio.gather(*(run_hashing(hash_password, u.password, PASSWORD_COST) for u in users))
+    created = await asyncio.gather(*(
+        user_writes.submit({"username": u.username, "password": hashed}) for u, hashed in zip(users, hashes)
+    ))
+    return {
+        "created": [u.username for u, ok in zip(users, created) if ok],
+        "existing": [u.username for u, ok in zip(users, created) if not ok],
+    }
+
 @app.post("/auth/token")
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+    enforce_rate_limit(login_limiter, form_data.username)
     user = await authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=401, detail="Incorrect username or password")
@@ -124,342 +330,78 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 # Main endpoints
 
 
-# Content-based filtering: static career database
-CAREER_DATABASE = [
-    # --- ENGINEERING DOMAIN ---
-    {
-        "title": "Software Engineer",
-        "domain": "Engineering",
-        "skills": ["programming", "software development", "algorithms", "problem-solving", "technology", "teamwork"],
-        "description": "Designs, develops, and maintains software applications and systems.",
-        "roadmap": ["Earn a degree in Computer Science or related field", "Learn programming languages (e.g., Python, Java, C++)", "Build software projects", "Apply for software engineering roles"]
-    },
-    {
-        "title": "Civil Engineer",
-        "domain": "Engineering",
-        "skills": ["structural analysis", "project management", "math", "design", "construction", "problem-solving"],
-        "description": "Designs and oversees construction of infrastructure projects like roads, bridges, and buildings.",
-        "roadmap": ["Earn a degree in Civil Engineering", "Gain internship experience", "Get licensed (PE)", "Apply for civil engineering jobs"]
-    },
-    {
-        "title": "Mechanical Engineer",
-        "domain": "Engineering",
-        "skills": ["mechanical design", "CAD", "math", "physics", "problem-solving", "manufacturing"],
-        "description": "Designs and builds mechanical systems and devices.",
-        "roadmap": ["Earn a degree in Mechanical Engineering", "Learn CAD software", "Work on engineering projects", "Apply for mechanical engineering roles"]
-    },
-    {
-        "title": "Electrical Engineer",
-        "domain": "Engineering",
-        "skills": ["circuit design", "electronics", "math", "problem-solving", "embedded systems", "communication"],
-        "description": "Designs and develops electrical systems and components.",
-        "roadmap": ["Earn a degree in Electrical Engineering", "Work on electronics projects", "Apply for electrical engineering jobs"]
-    },
-    # --- MEDICINE DOMAIN ---
-    {
-        "title": "Cardiologist",
-        "domain": "Medicine",
-        "skills": ["medicine", "cardiology", "diagnosis", "patient care", "communication", "research"],
-        "description": "Diagnoses and treats heart and cardiovascular conditions.",
-        "roadmap": ["Earn a medical degree (MD)", "Complete residency in internal medicine", "Complete fellowship in cardiology", "Get board certified", "Apply for cardiologist positions"]
-    },
-    {
-        "title": "General Surgeon",
-        "domain": "Medicine",
-        "skills": ["surgery", "anatomy", "patient care", "decision-making", "teamwork", "medical knowledge"],
-        "description": "Performs surgical operations to treat diseases and injuries.",
-        "roadmap": ["Earn a medical degree (MD)", "Complete surgical residency", "Get board certified", "Apply for surgeon positions"]
-    },
-    {
-        "title": "Nurse Practitioner",
-        "domain": "Medicine",
-        "skills": ["nursing", "patient care", "diagnosis", "communication", "medical knowledge", "teamwork"],
-        "description": "Provides advanced nursing care and can diagnose and treat illnesses.",
-        "roadmap": ["Earn a nursing degree (BSN)", "Become a registered nurse (RN)", "Complete nurse practitioner program (MSN or DNP)", "Get certified", "Apply for NP jobs"]
-    },
-    # --- SCIENCE DOMAIN ---
-    {
-        "title": "Data Scientist",
-        "domain": "Science",
-        "skills": ["statistics", "data analysis", "machine learning", "programming", "math", "curiosity"],
-        "description": "Analyzes and interprets complex data to help organizations make decisions.",
-        "roadmap": ["Earn a degree in Data Science, Statistics, or related field", "Learn Python/R", "Work on data projects", "Apply for data scientist roles"]
-    },
-    {
-        "title": "Research Physicist",
-        "domain": "Science",
-        "skills": ["physics", "math", "research", "problem-solving", "experimentation", "critical thinking"],
-        "description": "Conducts research to understand physical phenomena and develop new technologies.",
-        "roadmap": ["Earn a degree in Physics", "Complete a PhD in Physics", "Conduct research and publish papers", "Apply for research positions"]
-    },
-    {
-        "title": "Environmental Scientist",
-        "domain": "Science",
-        "skills": ["environmental science", "research", "analysis", "problem-solving", "communication"],
-        "description": "Studies the environment and develops solutions to environmental problems.",
-        "roadmap": ["Earn a degree in Environmental Science", "Conduct research", "Apply for scientist roles"]
-    },
-    # --- POLITICS & GOVERNMENT DOMAIN ---
-    {
-        "title": "Policy Analyst",
-        "domain": "Politics",
-        "skills": ["policy analysis", "research", "writing", "critical thinking", "communication", "public speaking"],
-        "description": "Researches and analyzes policies to advise governments and organizations.",
-        "roadmap": ["Earn a degree in Political Science, Public Policy, or related field", "Gain experience in policy research", "Apply for policy analyst roles"]
-    },
-    {
-        "title": "Diplomat",
-        "domain": "Politics",
-        "skills": ["diplomacy", "negotiation", "foreign languages", "communication", "international relations", "problem-solving"],
-        "description": "Represents a country abroad and manages international relations.",
-        "roadmap": ["Earn a degree in International Relations or related field", "Pass foreign service exam", "Gain experience abroad", "Apply for diplomat positions"]
-    },
-    {
-        "title": "Legislative Assistant",
-        "domain": "Politics",
-        "skills": ["research", "writing", "policy analysis", "communication", "organization", "public policy"],
-        "description": "Assists lawmakers by researching issues, drafting legislation, and communicating with constituents.",
-        "roadmap": ["Earn a degree in Political Science or related field", "Intern with a legislator", "Apply for legislative assistant roles"]
-    },
-    # --- BUSINESS & MANAGEMENT DOMAIN ---
-    {
-        "title": "Product Manager",
-        "domain": "Business",
-        "skills": ["product management", "leadership", "communication", "strategy", "market research", "problem-solving"],
-        "description": "Oversees the development and success of products from conception to launch.",
-        "roadmap": ["Earn a degree in Business, Engineering, or related field", "Gain experience in product development", "Apply for product manager roles"]
-    },
-    {
-        "title": "Financial Analyst",
-        "domain": "Business",
-        "skills": ["finance", "analysis", "excel", "communication", "problem-solving", "accounting"],
-        "description": "Analyzes financial data to help organizations make investment decisions.",
-        "roadmap": ["Earn a degree in Finance, Accounting, or related field", "Learn financial modeling", "Apply for financial analyst jobs"]
-    },
-    {
-        "title": "Human Resources Manager",
-        "domain": "Business",
-        "skills": ["human resources", "communication", "organization", "leadership", "conflict resolution", "recruitment"],
-        "description": "Manages hiring, training, and employee relations in organizations.",
-        "roadmap": ["Earn a degree in Human Resources or related field", "Gain HR experience", "Apply for HR manager roles"]
-    },
-    # --- CREATIVE & DESIGN DOMAIN ---
-    {
-        "title": "Graphic Designer",
-        "domain": "Creative",
-        "skills": ["creativity", "design", "visual arts", "communication", "technology", "adobe suite"],
-        "description": "Creates visual content for print and digital media.",
-        "roadmap": ["Earn a degree in Graphic Design or related field", "Build a portfolio", "Apply for design jobs"]
-    },
-    {
-        "title": "UX/UI Designer",
-        "domain": "Creative",
-        "skills": ["design", "creativity", "user research", "technology", "communication", "prototyping"],
-        "description": "Designs user interfaces and experiences for digital products.",
-        "roadmap": ["Learn UX/UI principles", "Build a design portfolio", "Apply for UX/UI jobs"]
-    },
-    {
-        "title": "Copywriter",
-        "domain": "Creative",
-        "skills": ["writing", "creativity", "marketing", "storytelling", "communication", "editing"],
-        "description": "Writes persuasive and engaging content for advertising and marketing.",
-        "roadmap": ["Earn a degree in English, Marketing, or related field", "Build a writing portfolio", "Apply for copywriting jobs"]
-    },
-    {
-        "title": "Software Engineer",
-        "skills": ["programming", "problem-solving", "logic", "technology", "math"],
-        "description": "Designs and builds software applications and systems.",
-        "roadmap": ["Learn programming basics", "Build software projects", "Apply for internships/jobs"]
-    },
-    {
-        "title": "Data Scientist",
-        "skills": ["statistics", "data analysis", "programming", "math", "curiosity"],
-        "description": "Analyzes and interprets complex data to help organizations make decisions.",
-        "roadmap": ["Learn statistics and Python", "Practice with datasets", "Apply for data science roles"]
-    },
-    {
-        "title": "Graphic Designer",
-        "skills": ["creativity", "design", "visual arts", "communication", "technology"],
-        "description": "Creates visual content for print and digital media.",
-        "roadmap": ["Learn design tools", "Build a portfolio", "Apply for design jobs"]
-    },
-    {
-        "title": "Mechanical Engineer",
-        "skills": ["math", "physics", "problem-solving", "design", "technology"],
-        "description": "Designs and builds mechanical systems and devices.",
-        "roadmap": ["Study engineering fundamentals", "Work on engineering projects", "Apply for engineering roles"]
-    },
-    {
-        "title": "Teacher",
-        "skills": ["communication", "patience", "organization", "subject knowledge", "empathy"],
-        "description": "Educates students in a variety of subjects.",
-        "roadmap": ["Earn a teaching degree", "Gain classroom experience", "Apply for teaching positions"]
-    },
-    {
-        "title": "Marketing Specialist",
-        "skills": ["communication", "creativity", "analytics", "strategy", "persuasion"],
-        "description": "Promotes products and services to target audiences.",
-        "roadmap": ["Learn marketing basics", "Work on campaigns", "Apply for marketing jobs"]
-    },
-    {
-        "title": "Nurse",
-        "skills": ["empathy", "medical knowledge", "patience", "teamwork", "attention to detail"],
-        "description": "Provides care and support to patients in healthcare settings.",
-        "roadmap": ["Earn a nursing degree", "Complete clinical training", "Apply for nursing jobs"]
-    },
-    {
-        "title": "Accountant",
-        "skills": ["math", "attention to detail", "organization", "finance", "analysis"],
-        "description": "Manages financial records and prepares reports for organizations.",
-        "roadmap": ["Earn an accounting degree", "Get certified (e.g., CPA)", "Apply for accounting jobs"]
-    },
-    {
-        "title": "Civil Engineer",
-        "skills": ["math", "design", "project management", "problem-solving", "teamwork"],
-        "description": "Designs and oversees construction projects like roads, bridges, and buildings.",
-        "roadmap": ["Earn a civil engineering degree", "Work on construction projects", "Apply for engineering roles"]
-    },
-    {
-        "title": "Chef",
-        "skills": ["creativity", "cooking", "organization", "time management", "teamwork"],
-        "description": "Prepares meals and manages kitchen staff in restaurants or hotels.",
-        "roadmap": ["Attend culinary school", "Gain kitchen experience", "Apply for chef positions"]
-    },
-    {
-        "title": "Pharmacist",
-        "skills": ["medical knowledge", "attention to detail", "communication", "organization", "science"],
-        "description": "Dispenses medications and advises patients on their proper use.",
-        "roadmap": ["Earn a pharmacy degree", "Complete internship", "Apply for pharmacist jobs"]
-    },
-    {
-        "title": "Lawyer",
-        "skills": ["critical thinking", "communication", "research", "argumentation", "analysis"],
-        "description": "Represents clients in legal matters and provides legal advice.",
-        "roadmap": ["Earn a law degree", "Pass the bar exam", "Apply for legal positions"]
-    },
-    {
-        "title": "Psychologist",
-        "skills": ["empathy", "research", "communication", "analysis", "patience"],
-        "description": "Studies mental processes and helps people manage mental health issues.",
-        "roadmap": ["Earn a psychology degree", "Complete supervised practice", "Apply for psychologist roles"]
-    },
-    {
-        "title": "Sales Manager",
-        "skills": ["communication", "persuasion", "leadership", "strategy", "negotiation"],
-        "description": "Leads sales teams and develops strategies to meet sales targets.",
-        "roadmap": ["Gain sales experience", "Develop leadership skills", "Apply for sales manager roles"]
-    },
-    {
-        "title": "Web Developer",
-        "skills": ["programming", "design", "problem-solving", "technology", "creativity"],
-        "description": "Builds and maintains websites and web applications.",
-        "roadmap": ["Learn web development", "Build web projects", "Apply for web developer jobs"]
-    },
-    {
-        "title": "Electrician",
-        "skills": ["technical skills", "problem-solving", "attention to detail", "safety", "math"],
-        "description": "Installs and maintains electrical systems in homes and businesses.",
-        "roadmap": ["Complete electrician training", "Get licensed", "Apply for electrician jobs"]
-    },
-    {
-        "title": "Journalist",
-        "skills": ["writing", "research", "communication", "curiosity", "critical thinking"],
-        "description": "Researches and writes news stories for media outlets.",
-        "roadmap": ["Earn a journalism degree", "Build a writing portfolio", "Apply for journalist positions"]
-    },
-    {
-        "title": "UX/UI Designer",
-        "skills": ["design", "creativity", "user research", "technology", "communication"],
-        "description": "Designs user interfaces and experiences for digital products.",
-        "roadmap": ["Learn UX/UI principles", "Build a design portfolio", "Apply for UX/UI jobs"]
-    },
-    {
-        "title": "Environmental Scientist",
-        "skills": ["science", "research", "analysis", "problem-solving", "communication"],
-        "description": "Studies the environment and develops solutions to environmental problems.",
-        "roadmap": ["Earn an environmental science degree", "Conduct research", "Apply for scientist roles"]
-    },
-    {
-        "title": "Entrepreneur",
-        "skills": ["leadership", "creativity", "risk-taking", "strategy", "problem-solving"],
-        "description": "Starts and manages new business ventures.",
-        "roadmap": ["Develop a business idea", "Create a business plan", "Launch and grow your business"]
-    },
-    {
-        "title": "Project Manager",
-        "skills": ["leadership", "organization", "communication", "planning", "problem-solving"],
-        "description": "Oversees projects and teams to ensure goals are met on time and within budget.",
-        "roadmap": ["Earn a degree (any field)", "Gain project experience", "Get PMP certification", "Apply for project manager roles"]
-    },
-    {
-        "title": "Social Worker",
-        "skills": ["empathy", "communication", "problem-solving", "advocacy", "organization"],
-        "description": "Helps individuals and families cope with challenges in their lives.",
-        "roadmap": ["Earn a social work degree", "Complete supervised practice", "Apply for social worker jobs"]
-    },
-    {
-        "title": "Police Officer",
-        "skills": ["physical fitness", "communication", "problem-solving", "teamwork", "integrity"],
-        "description": "Protects the public, prevents crime, and enforces laws.",
-        "roadmap": ["Complete police academy training", "Pass background checks", "Apply for police officer positions"]
-    },
-    {
-        "title": "Flight Attendant",
-        "skills": ["communication", "customer service", "problem-solving", "teamwork", "adaptability"],
-        "description": "Ensures passenger safety and comfort on flights.",
-        "roadmap": ["Meet airline requirements", "Complete training", "Apply for flight attendant jobs"]
-    },
-    {
-        "title": "Fitness Trainer",
-        "skills": ["physical fitness", "motivation", "communication", "teaching", "planning"],
-        "description": "Helps clients achieve fitness goals through exercise and nutrition guidance.",
-        "roadmap": ["Earn fitness certification", "Gain experience", "Apply for trainer positions"]
-    },
-    {
-        "title": "Plumber",
-        "skills": ["technical skills", "problem-solving", "attention to detail", "manual dexterity", "customer service"],
-        "description": "Installs and repairs plumbing systems in homes and businesses.",
-        "roadmap": ["Complete apprenticeship", "Get licensed", "Apply for plumber jobs"]
-    },
-    {
-        "title": "Veterinarian",
-        "skills": ["medical knowledge", "empathy", "problem-solving", "attention to detail", "communication"],
-        "description": "Provides medical care to animals.",
-        "roadmap": ["Earn a veterinary degree", "Complete clinical training", "Apply for veterinarian jobs"]
-    },
-    # Add more careers as needed
-]
-
-from difflib import SequenceMatcher
-
-# Synonyms map for real-life matching
-SYNONYMS = {
-    "programming": ["coding", "software development", "developer", "engineer"],
-    "math": ["mathematics", "arithmetic", "calculus", "algebra"],
-    "communication": ["speaking", "writing", "presenting", "public speaking"],
-    "creativity": ["creative", "imagination", "innovation", "artistic"],
-    "problem-solving": ["troubleshooting", "critical thinking", "solution", "analytical"],
-    "leadership": ["management", "supervision", "team lead", "coordinator"],
-    "organization": ["organizational", "planning", "scheduling", "coordination"],
-    "customer service": ["client service", "customer support", "help desk"],
-    "medical knowledge": ["medicine", "healthcare", "clinical", "doctor", "nurse"],
-    # Add more as needed
-}
+# Content-based filtering: the career catalog and synonym map live in CATALOG_FILE.
+# Edits are picked up without a restart (checked every CATALOG_CHECK_INTERVAL
+# seconds) or on demand via POST /admin/catalog/reload.
+CATALOG_FILE = os.getenv("CATALOG_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "careers.json"))
+CATALOG_CHECK_INTERVAL = float(os.getenv("CATALOG_CHECK_INTERVAL", "5"))
+catalog_watcher = CatalogWatcher(CATALOG_FILE, CATALOG_CHECK_INTERVAL)
+
+# Cached recommendations keyed on the normalized profile (see prediction_cache_key)
+prediction_cache = LRUCache(
+    maxsize=int(os.getenv("PREDICTION_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("PREDICTION_CACHE_TTL", "3600")),
+)
+
+def install_career_index(index):
+    # Swaps in a new index and drops every cached result computed against the
+    # old one; requests already scoring finish on the index they started with
+    global career_index
+    career_index = index
+    prediction_cache.clear()
+
+def rebuild_career_index(careers, synonyms=None):
+    # Installs an index built from catalog dicts held in memory instead of
+    # CATALOG_FILE; synonyms default to the current catalog's
+    if synonyms is None:
+        synonyms = current_career_index().synonym_groups
+    install_career_index(build_index(merge_duplicates(careers), synonyms))
+    return career_index
+
+def load_career_catalog():
+    install_career_index(catalog_watcher.load())
+    return career_index
+
+career_index = None
+career_index_lock = threading.Lock()
+
+def current_career_index():
+    # Runs in whichever worker scores the request, so process pools load and
+    # reload the catalog themselves; a broken file is logged and the current
+    # catalog stays in place
+    if career_index is None:
+        with career_index_lock:
+            if career_index is None:
+                load_career_catalog()
+        return career_index
+    if catalog_watcher.changed():
+        try:
+            install_career_index(load_index(CATALOG_FILE))
+        except (OSError, ValueError) as exc:
+            logger.warning("Keeping the current career catalog, reloading %s failed: %s", CATALOG_FILE, exc)
+    return career_index
+
+# Built on the first batch request after each catalog change
+batch_scorer = None
+
+def get_batch_scorer(index):
+    from batch_scoring import BatchScorer
+    global batch_scorer
+    scorer = batch_scorer
+    if scorer is None or scorer.index is not index:
+        scorer = batch_scorer = BatchScorer(index)
+    return scorer
 
 def expand_keywords(keywords):
-    expanded = set()
-    for kw in keywords:
-        expanded.add(kw)
-        for k, syns in SYNONYMS.items():
-            if kw == k or kw in syns:
-                expanded.add(k)
-                expanded.update(syns)
-    return expanded
-
-def similar(a, b):
-    return SequenceMatcher(None, a, b).ratio() > 0.7
-
-def get_career_recommendation_content_based(profile: Profile):
+    return current_career_index().expand(keywords)
+
+def prediction_cache_key(index, keywords, limit=3, mode="overlap"):
+    # Lower-cased, synonym-expanded and sorted, so the key ignores field order,
+    # casing and user_id; the index fingerprint ties it to the catalog version
+    digest = hashlib.sha256("\x1f".join(sorted(keywords)).encode()).hexdigest()
+    return f"{index.fingerprint}:{mode}:{limit}:{digest}"
+
+def profile_keywords(profile: Profile):
     # Combine all user profile fields into a set of keywords
     user_keywords = set()
     user_keywords.update([s.lower() for s in profile.skills])
@@ -467,33 +409,20 @@ def get_career_recommendation_content_based(profile: Profile):
     user_keywords.add(profile.education.lower())
     user_keywords.add(profile.personality.lower())
     user_keywords.add(profile.goals.lower())
-    user_keywords = expand_keywords(user_keywords)
-
-    # Score each career by overlap, partial match, and synonyms
-    scored_careers = []
-    for career in CAREER_DATABASE:
-        career_keywords = expand_keywords([s.lower() for s in career["skills"]])
-        overlap = len(user_keywords.intersection(career_keywords))
-        # Add partial match score
-        for uk in user_keywords:
-            for ck in career_keywords:
-                if uk != ck and similar(uk, ck):
-                    overlap += 0.5
-        scored_careers.append((overlap, career))
-
-    # Sort by score descending, then by title
-    scored_careers.sort(key=lambda x: (-x[0], x[1]["title"]))
-
-    # Return top 3 matches with descriptions and roadmap
+    return user_keywords
+
+def build_recommendations(index, ranked):
+    # Turn ranked (career_id, score) pairs into matches with descriptions and roadmap
+    careers = index.careers
     recommendations = []
-    for score, career in scored_careers[:3]:
-        if score > 0:
-            recommendations.append({
-                "career": career["title"],
-                "description": career["description"],
-                "roadmap": career["roadmap"],
-                "match_score": score
-            })
+    for career_id, score in ranked:
+        career = careers[career_id]
+        recommendations.append({
+            "career": career.title,
+            "description": career.description,
+            "roadmap": list(career.roadmap),
+            "match_score": score
+        })
     if not recommendations:
         recommendations.append({
             "career": "No strong match found",
@@ -503,30 +432,317 @@ def get_career_recommendation_content_based(profile: Profile):
         })
     return recommendations
 
-# New endpoint for content-based prediction
-@app.post("/predict-career-content-based")
-async def predict_career_content_based(profile: Profile, user=Depends(get_current_user)):
-    recommendations = get_career_recommendation_content_based(profile)
-    prediction = {
-        "user_id": profile.user_id,
+def get_career_recommendation_content_based(profile: Profile, top_k: int = 3, offset: int = 0, mode: str = "overlap"):
+    # Matches ranked offset+1 .. offset+top_k; the first page falls back to
+    # "No strong match found" when nothing scores
+    index = current_career_index()
+    limit = offset + top_k
+    with PHASE_SECONDS.time("expand"):
+        keywords = index.expand(profile_keywords(profile))
+        key = prediction_cache_key(index, keywords, limit, mode)
+    recommendations = prediction_cache.get(key, None)
+    if recommendations is not None:
+        return recommendations[offset:]
+
+    if mode == "tfidf":
+        with PHASE_SECONDS.time("tfidf"):
+            ranked = index.top_weighted(keywords, limit)
+    else:
+        # Only careers sharing a keyword (or possibly a similar one) with the profile are candidates
+        with PHASE_SECONDS.time("exact"):
+            exact = index.exact_counts(keywords)
+        with PHASE_SECONDS.time("fuzzy_candidates"):
+            pairs = index.fuzzy_candidates(keywords)
+
+        # Best `limit` by score, then title (catalog order breaks remaining ties). The
+        # SequenceMatcher checks happen here, interleaved with picking the top careers,
+        # so this phase is the fuzzy matching and the sort together
+        with PHASE_SECONDS.time("fuzzy_match_select"):
+            ranked = index.top(exact, pairs, limit)
+
+    recommendations = build_recommendations(index, ranked)
+    prediction_cache.set(key, recommendations)
+    return recommendations[offset:]
+
+def get_career_recommendations_batch(profiles: list[Profile]):
+    # Same results as get_career_recommendation_content_based; cache misses are
+    # scored together, one counting pass per chunk
+    index = current_career_index()
+    scorer = get_batch_scorer(index)
+    keyword_sets = [index.expand(profile_keywords(p)) for p in profiles]
+    keys = [prediction_cache_key(index, keywords) for keywords in keyword_sets]
+    results = [prediction_cache.get(key, None) for key in keys]
+
+    misses = [i for i, result in enumerate(results) if result is None]
+    with PHASE_SECONDS.time("batch"):
+        ranked = scorer.score([keyword_sets[i] for i in misses], top_k=3)
+    for i, r in zip(misses, ranked):
+        results[i] = build_recommendations(index, r)
+        prediction_cache.set(keys[i], results[i])
+    return results
+
+def make_prediction(user_id: str, recommendations: list[dict]):
+    return {
+        "user_id": user_id,
         "careers": recommendations,
         "reasoning": "Based on your skills, interests, and background, these careers are a strong fit.",
         "roadmap": recommendations[0]["roadmap"] if recommendations and recommendations[0]["roadmap"] else []
     }
-    with lock:
-        predictions[profile.user_id] = prediction
+
+def history_entry(profile: Profile, prediction: dict):
+    # The survey answers plus the careers suggested for them
+    return dict(profile.dict(), careers=prediction["careers"])
+
+# New endpoint for content-based prediction; top_k/offset page through the ranking.
+# mode=overlap counts shared keywords; mode=tfidf ranks by TF-IDF cosine similarity.
+MAX_RESULTS = int(os.getenv("MAX_RESULTS", "100"))
+SCORING_MODE = os.getenv("SCORING_MODE", "overlap")
+
+# Identical requests arriving while one is being scored (double clicks, client
+# retries) wait for that result instead of queueing another scoring job
+predictions_in_flight = SingleFlight()
+
+@app.post("/predict-career-content-based")
+async def predict_career_content_based(
+    profile: Profile,
+    top_k: int = Query(3, ge=1, le=MAX_RESULTS),
+    offset: int = Query(0, ge=0),
+    mode: Literal["overlap", "tfidf"] = Query(SCORING_MODE),
+    user=Depends(prediction_user),
+):
+    if offset + top_k > MAX_RESULTS:
+        raise HTTPException(status_code=400, detail=f"offset + top_k may not exceed {MAX_RESULTS}")
+    # The ranking only depends on the profile's keywords, not on user_id or field order
+    key = (mode, top_k, offset, frozenset(profile_keywords(profile)))
+    recommendations = await predictions_in_flight.run(
+        key, run_scoring, get_career_recommendation_content_based, profile, top_k, offset, mode)
+    prediction = make_prediction(profile.user_id, recommendations)
+    # Later pages are not the user's result, so only the first page is stored.
+    # Survey history is only added to for the caller's own account
+    if offset == 0:
+        history = [history_entry(profile, prediction)] if owns_account(user, profile.user_id) else []
+        await store_write("save_predictions", get_store().save_predictions, [prediction], history)
     return prediction
 
+# Batch prediction for whole cohorts of profiles
+@app.post("/predict-career-content-based/batch")
+async def predict_career_content_based_batch(
+    profiles: list[Profile] = Body(..., max_length=MAX_BULK_ITEMS),
+    user=Depends(prediction_user),
+):
+    ranked = await run_scoring(get_career_recommendations_batch, profiles)
+    batch = [
+        make_prediction(profile.user_id, recommendations)
+        for profile, recommendations in zip(profiles, ranked)
+    ]
+    # Cohorts span many accounts, so only admins add them to survey history
+    history = []
+    if user["username"] in ADMIN_USERS:
+        history = [history_entry(profile, prediction) for profile, prediction in zip(profiles, batch)]
+    await store_write("save_predictions", get_store().save_predictions, batch, history)
+    return batch
+
+# What-if editing: each user's scoring state is kept between calls, so when a
+# resubmitted profile differs by a keyword or two only the careers those
+# keywords touch are re-scored. Same results as the overlap mode of
+# /predict-career-content-based; nothing is stored. Sessions are per worker:
+# one missing (evicted, expired, other worker) is rebuilt from the profile.
+scoring_sessions = LRUCache(
+    maxsize=int(os.getenv("SCORING_SESSIONS", "1000")),
+    ttl=float(os.getenv("SCORING_SESSION_TTL", "1800")),
+)
+
+def rescore_session(username, profile: Profile, top_k: int = 3, offset: int = 0):
+    index = current_career_index()
+    # Taken out while in use, so concurrent calls never update one session together
+    session = scoring_sessions.pop(username, None)
+    if session is None or session.index is not index:
+        session = ScoringSession(index)
+    with PHASE_SECONDS.time("session"):
+        session.update(profile_keywords(profile))
+        ranked = session.top(offset + top_k)
+    scoring_sessions.set(username, session)
+    return build_recommendations(index, ranked)[offset:]
+
+@app.post("/predict-career-content-based/session")
+async def predict_career_session(
+    profile: Profile,
+    top_k: int = Query(3, ge=1, le=MAX_RESULTS),
+    offset: int = Query(0, ge=0),
+    user=Depends(prediction_user),
+):
+    if offset + top_k > MAX_RESULTS:
+        raise HTTPException(status_code=400, detail=f"offset + top_k may not exceed {MAX_RESULTS}")
+    recommendations = await run_scoring(rescore_session, user["username"], profile, top_k, offset)
+    return make_prediction(profile.user_id, recommendations)
+
+# Careers similar to a given one, from the neighbour table built with each catalog
+def career_summary(index, career_id, score=None):
+    career = index.careers[career_id]
+    summary = {"career": career.title, "domain": career.domain, "description": career.description}
+    if score is not None:
+        summary["score"] = score
+    return summary
+
+def find_career(index, title):
+    career_id = index.find(title)
+    if career_id is None:
+        raise HTTPException(status_code=404, detail=f"Unknown career: {title}")
+    return career_id
+
+def compare_score(index, a, b):
+    score = index.related.score(a, b)
+    return score if score is not None else float(index.pair_score(a, b))
+
+@app.get("/careers/compare")
+async def compare_careers(
+    titles: list[str] = Query(..., min_length=2, max_length=5),
+    user=Depends(get_current_user),
+):
+    # Pairwise scores use the same keyword semantics as the related-careers table
+    # and are read from it when one career is among the other's neighbours;
+    # other pairs are scored on demand (at most 10 pairs of ~20 keywords each).
+    # A pending catalog reload rebuilds the index, so it runs off the event loop
+    index = await run_in_threadpool(current_career_index)
+    ids = [find_career(index, title) for title in titles]
+    careers = [dict(career_summary(index, i), skills=list(index.careers[i].skills)) for i in ids]
+    pairs = [
+        {
+            "a": index.careers[a].title,
+            "b": index.careers[b].title,
+            "score": compare_score(index, a, b),
+            "shared_keywords": sorted(index.keywords[a] & index.keywords[b]),
+        }
+        for n, a in enumerate(ids) for b in ids[n + 1:]
+    ]
+    return {"careers": careers, "pairs": pairs}
+
+@app.get("/careers/{title:path}/related")
+async def related_careers(
+    title: str,
+    limit: int = Query(RELATED_CAREERS, ge=1, le=RELATED_CAREERS),
+    user=Depends(get_current_user),
+):
+    index = await run_in_threadpool(current_career_index)
+    career_id = find_career(index, title)
+    return {
+        "career": index.careers[career_id].title,
+        "related": [career_summary(index, other, score) for other, score in index.related.neighbours(career_id, limit)],
+    }
+
+# Reload CATALOG_FILE now rather than at the next change check; process pool
+# workers still pick the change up through their own check
+@app.post("/admin/catalog/reload")
+async def reload_catalog(user=Depends(require_admin)):
+    try:
+        index = await run_in_threadpool(load_career_catalog)
+    except (OSError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"Catalog not reloaded: {exc}")
+    return {"careers": len(index.careers), "fingerprint": index.fingerprint}
+
+# Prediction cache counters
+@app.get("/cache/stats")
+async def cache_stats():
+    return prediction_cache.stats()
+
+def cache_counters():
+    for name, cache in (("prediction", prediction_cache), ("token", token_cache), ("session", scoring_sessions)):
+        stats = cache.stats()
+        for stat in ("hits", "misses", "evictions", "size"):
+            yield (name, stat), stats[stat]
+
+registry.register(Gauge("cache_stats", "Hit, miss, eviction and size counters per cache.", cache_counters, ("cache", "stat")))
+
+def throttle_counters():
+    yield ("predict",), predict_limiter.rejected
+    yield ("login",), login_limiter.rejected
+
+registry.register(Gauge("rate_limited_requests", "Requests rejected with 429 per limit.", throttle_counters, ("limit",)))
+registry.register(Gauge(
+    "predictions_coalesced", "Prediction requests answered by an identical one already being scored.",
+    lambda: [((), predictions_in_flight.shared)]))
+
+def write_queue_counters():
+    for name, queue in (("users", user_writes), ("feedback", feedback_writes)):
+        yield (name, "batches"), queue.batches
+        yield (name, "items"), queue.items
+        yield (name, "pending"), len(queue)
+
+registry.register(Gauge(
+    "group_commit_writes", "Committed batches, committed items and queued items per write-behind queue.",
+    write_queue_counters, ("queue", "stat")))
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(registry.exposition(), media_type="text/plain; version=0.0.4")
+
 @app.get("/results/{user_id}")
 async def get_results(user_id: str, user=Depends(get_current_user)):
-    with lock:
-        result = predictions.get(user_id)
-        if not result:
-            raise HTTPException(status_code=404, detail="No results found")
-        return result
+    result = await run_in_threadpool(get_store().get_prediction, user_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="No results found")
+    return result
+
+# Survey history: every stored prediction with its answers, newest first.
+# Pass the `next` value of a page as `before` to get the following one.
+@app.get("/history/{user_id}")
+async def get_history(
+    user_id: str,
+    before: Optional[int] = Query(None, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    user=Depends(require_account_owner),
+):
+    items = await run_in_threadpool(get_store().get_history, user_id, before, limit)
+    return {"items": items, "next": items[-1]["id"] if len(items) == limit else None}
+
+# Survey count, most suggested careers and favorites count, maintained on write
+@app.get("/history/{user_id}/summary")
+async def get_history_summary(user_id: str, user=Depends(require_account_owner)):
+    return await run_in_threadpool(get_store().get_history_summary, user_id)
+
+@app.get("/favorites/{user_id}")
+async def get_favorites(user_id: str, user=Depends(require_account_owner)):
+    return await run_in_threadpool(get_store().get_favorites, user_id)
+
+@app.put("/favorites/{user_id}/{career:path}")
+async def add_favorite(user_id: str, career: str, user=Depends(require_account_owner)):
+    created = await store_write("add_favorite", get_store().add_favorite, user_id, career)
+    return {"career": career, "created": created}
+
+@app.delete("/favorites/{user_id}/{career:path}")
+async def remove_favorite(user_id: str, career: str, user=Depends(require_account_owner)):
+    if not await store_write("remove_favorite", get_store().remove_favorite, user_id, career):
+        raise HTTPException(status_code=404, detail="Not a favorite")
+    return {"msg": "Favorite removed"}
 
 @app.post("/feedback")
 async def submit_feedback(feedback: Feedback, user=Depends(get_current_user)):
-    with lock:
-        feedbacks.append(feedback.dict())
+    feedback_writes.enqueue(feedback.dict())
     return {"msg": "Feedback received"}
+
+@app.post("/feedback/bulk")
+async def submit_feedback_bulk(
+    feedbacks: list[Feedback] = Body(..., max_length=MAX_BULK_ITEMS),
+    user=Depends(get_current_user),
+):
+    for feedback in feedbacks:
+        feedback_writes.enqueue(feedback.dict())
+    return {"msg": "Feedback received", "count": len(feedbacks)}
+
+# Analytics export: NDJSON in cursor order, gzip-compressed when the client
+# accepts it. Every line has a cursor; resume with ?cursor=<last one received>.
+def export_response(request: Request, fetch, cursor: int):
+    chunks = ndjson_chunks(fetch, cursor)
+    headers = {"Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type="application/x-ndjson", headers=headers)
+
+@app.get("/export/predictions")
+async def export_predictions(request: Request, cursor: int = Query(0, ge=0), user=Depends(require_admin)):
+    return export_response(request, get_store().export_predictions, cursor)
+
+@app.get("/export/feedback")
+async def export_feedback(request: Request, cursor: int = Query(0, ge=0), user=Depends(require_admin)):
+    return export_response(request, get_store().export_feedbacks, cursor)
@@ -0,0 +1,131 @@
+# Minimal Prometheus-style metrics: histograms, gauges and timing spans
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Seconds; fine enough for sub-millisecond recommender phases
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, [('le', le)])} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}"
+
+
+class Gauge:
+    """Value read at scrape time from a callback."""
+
+    def __init__(self, name, documentation, callback, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        for labels, value in self.callback():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def exposition(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by method, route template and status.
+
+    `on_finish(label, start, end)` is called after each request, e.g. to hand
+    slow requests to the sampling profiler.
+    """
+
+    def __init__(self, app, histogram, on_finish=None):
+        self.app = app
+        self.histogram = histogram
+        self.on_finish = on_finish
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end = time.perf_counter()
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            self.histogram.observe(end - start, scope["method"], path, str(status))
+            if self.on_finish is not None:
+                self.on_finish(f"{scope['method']} {path}", start, end)
@@ -0,0 +1,58 @@
+# Password hashing with scrypt from the standard library
+import base64
+import hashlib
+import hmac
+import os
+
+SCHEME = "scrypt"
+DEFAULT_COST = 2 ** 14  # scrypt N; memory use is about 128 * N * r bytes
+BLOCK_SIZE = 8
+PARALLELISM = 1
+SALT_BYTES = 16
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=128 * r * (n + p + 2) + (1 << 20), dklen=32,
+    )
+
+
+def hash_password(password, cost=DEFAULT_COST):
+    # Stored as scrypt$N$r$p$salt$hash so the cost can change without breaking old entries
+    salt = os.urandom(SALT_BYTES)
+    digest = _scrypt(password, salt, cost, BLOCK_SIZE, PARALLELISM)
+    return "$".join([
+        SCHEME, str(cost), str(BLOCK_SIZE), str(PARALLELISM),
+        base64.b64encode(salt).decode(), base64.b64encode(digest).decode(),
+    ])
+
+
+def dummy_hash(cost=DEFAULT_COST):
+    # Well-formed hash that no password matches; checking against it costs as much as a real one
+    return "$".join([
+        SCHEME, str(cost), str(BLOCK_SIZE), str(PARALLELISM),
+        base64.b64encode(bytes(SALT_BYTES)).decode(), base64.b64encode(bytes(32)).decode(),
+    ])
+
+
+def is_hashed(stored):
+    return stored.startswith(SCHEME + "$")
+
+
+def verify_password(password, stored):
+    if not is_hashed(stored):
+        # Plaintext entry left by an import from before users.json was hashed on the way in
+        return hmac.compare_digest(password.encode(), stored.encode())
+    _, n, r, p, salt, digest = stored.split("$")
+    expected = base64.b64decode(digest)
+    actual = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    return hmac.compare_digest(actual, expected)
+
+
+def needs_rehash(stored, cost=DEFAULT_COST):
+    # Plaintext entries and hashes made with a different cost get upgraded on login
+    if not is_hashed(stored):
+        return True
+    _, n, r, p, _, _ = stored.split("$")
+    return (int(n), int(r), int(p)) != (cost, BLOCK_SIZE, PARALLELISM)
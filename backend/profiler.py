@@ -0,0 +1,87 @@
+# Opt-in sampling profiler that dumps flame-graph-ready stacks for slow requests
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# Leaf frames in these files are threads parked on a lock, queue or selector
+IDLE_FILES = ("threading.py", "queue.py", "selectors.py", "thread.py")
+
+
+class SlowRequestProfiler:
+    """Samples every thread's stack in the background and keeps a short history.
+
+    When a request takes longer than `threshold` seconds, the samples taken
+    while it ran are written as collapsed stacks ("frame;frame;frame count"),
+    the input format of flamegraph.pl and speedscope. The file is written by
+    the sampler thread, never by the request that reported it.
+    """
+
+    def __init__(self, threshold, directory, interval=0.005, history=20_000):
+        self.threshold = threshold
+        self.directory = directory
+        self.interval = interval
+        self._samples = deque(maxlen=history)
+        self._slow = deque(maxlen=100)  # (label, start, end) of slow requests awaiting a dump
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            self._dump_slow()
+            now = time.perf_counter()
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == me or frame.f_code.co_filename.endswith(IDLE_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._samples.append((now, ";".join(reversed(stack))))
+        self._dump_slow()
+
+    def request_finished(self, label, start, end):
+        # Called on the event loop with perf_counter timestamps, so it only
+        # queues slow requests for the sampler thread to dump
+        if end - start >= self.threshold:
+            self._slow.append((label, start, end))
+
+    def _dump_slow(self):
+        while self._slow:
+            self.dump(*self._slow.popleft())
+
+    def dump(self, label, start, end):
+        # Writes the samples taken between start and end; None if there were none
+        counts = {}
+        for when, stack in list(self._samples):
+            if start <= when <= end:
+                counts[stack] = counts.get(stack, 0) + 1
+        if not counts:
+            return None
+        safe = "".join(c if c.isalnum() else "_" for c in label)[:80]
+        path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{int((end - start) * 1e3)}ms-{safe}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(counts.items()):
+                f.write(f"{stack} {count}\n")
+        return path
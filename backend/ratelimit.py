@@ -0,0 +1,50 @@
+# Per-user token buckets for rate limiting, kept in process memory
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """`rate` requests per second per key, with bursts of up to `burst`.
+
+    Each key costs one (tokens, last seen) pair. A bucket left alone for
+    `burst / rate` seconds is full again, i.e. no different from a key never
+    seen, so dropping the least recently used keys beyond `maxsize` only ever
+    forgets users who have gone quiet. A `rate` of 0 disables limiting.
+    """
+
+    def __init__(self, rate, burst, maxsize=100_000, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.maxsize = maxsize
+        self.clock = clock
+        self.rejected = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        # 0 when a token was taken, otherwise the seconds until one will be available
+        if self.rate <= 0:
+            return 0.0
+        now = self.clock()
+        with self._lock:
+            entry = self._buckets.get(key)
+            if entry is None:
+                tokens = self.burst
+            else:
+                tokens, last = entry
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+                self.rejected += 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self):
+        return len(self._buckets)
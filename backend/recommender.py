@@ -0,0 +1,425 @@
+# Precompiled career index for the content-based recommender
+import hashlib
+import heapq
+import json
+import math
+import sys
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+SIMILARITY_THRESHOLD = 0.7
+# A misspelt profile keyword counts for this share of the term it resembles
+FUZZY_WEIGHT = 0.5
+# Neighbours kept per career for the related-careers lookup
+RELATED_CAREERS = 10
+
+
+# Pair decisions are pure, so they are memoized across requests and indexes
+@lru_cache(maxsize=1 << 16)
+def similar(a, b):
+    return SequenceMatcher(None, a, b).ratio() > SIMILARITY_THRESHOLD
+
+
+class FuzzyIndex:
+    """Character index over a vocabulary that narrows down `similar` candidates.
+
+    SequenceMatcher's ratio is 2*M/(len(a)+len(b)) where M never exceeds the
+    number of characters the two strings have in common (as multisets), nor the
+    shorter length. Candidates are the terms whose shared-character bound still
+    clears the threshold, so checking only them gives exactly the same matches
+    as comparing against the whole vocabulary.
+    """
+
+    def __init__(self, vocabulary, cache_size=4096):
+        # Term ids are assigned by length so a length window is an id range
+        self.terms = tuple(sorted(set(vocabulary), key=lambda t: (len(t), t)))
+        self.lengths = tuple(len(t) for t in self.terms)
+
+        chars = {}
+        for term_id, term in enumerate(self.terms):
+            for ch, n in Counter(term).items():
+                ids, counts = chars.setdefault(ch, ([], []))
+                ids.append(term_id)
+                counts.append(n)
+        self.chars = {ch: (tuple(ids), tuple(counts)) for ch, (ids, counts) in chars.items()}
+
+        self.candidates = lru_cache(maxsize=cache_size)(self._candidates)
+
+    def to_state(self):
+        return (self.terms, self.lengths, self.chars)
+
+    @classmethod
+    def from_state(cls, state, cache_size=4096):
+        fuzzy = cls.__new__(cls)
+        fuzzy.terms, fuzzy.lengths, fuzzy.chars = state
+        fuzzy.candidates = lru_cache(maxsize=cache_size)(fuzzy._candidates)
+        return fuzzy
+
+    def _candidates(self, word):
+        size = len(word)
+        if not size:
+            return ()
+        # 2*min(la, lb)/(la + lb) must exceed the threshold
+        t = SIMILARITY_THRESHOLD
+        lo = bisect_left(self.lengths, int(size * t / (2 - t)))
+        hi = bisect_right(self.lengths, int(size * (2 - t) / t) + 1)
+
+        common = {}
+        for ch, n in Counter(word).items():
+            posting = self.chars.get(ch)
+            if posting is None:
+                continue
+            ids, counts = posting
+            for i in range(bisect_left(ids, lo), bisect_left(ids, hi)):
+                term_id = ids[i]
+                m = counts[i]
+                common[term_id] = common.get(term_id, 0) + (n if n < m else m)
+
+        lengths = self.lengths
+        return tuple(
+            self.terms[term_id]
+            for term_id, shared in common.items()
+            if 2.0 * shared / (size + lengths[term_id]) > t
+        )
+
+    def matches(self, word):
+        """Vocabulary terms similar to (and different from) `word`."""
+        return [term for term in self.candidates(word) if term != word and similar(word, term)]
+
+
+class Career:
+    """One catalog entry.
+
+    Slots instead of a dict per career, tuples instead of lists, and interned
+    strings: titles, skills and roadmap steps recur across the catalog and are
+    stored once.
+    """
+
+    __slots__ = ("title", "skills", "description", "roadmap", "domain")
+
+    def __init__(self, title, skills, description, roadmap, domain=None):
+        self.title = sys.intern(title)
+        self.skills = tuple(sys.intern(s) for s in skills)
+        self.description = description
+        self.roadmap = tuple(sys.intern(step) for step in roadmap)
+        self.domain = None if domain is None else sys.intern(domain)
+
+    @classmethod
+    def from_dict(cls, career):
+        return cls(career["title"], career["skills"], career["description"], career["roadmap"], career.get("domain"))
+
+    def to_dict(self):
+        career = {"title": self.title, "skills": list(self.skills), "description": self.description,
+                  "roadmap": list(self.roadmap)}
+        if self.domain is not None:
+            career["domain"] = self.domain
+        return career
+
+    # Field order matches __init__, so Career(*career.to_tuple()) round-trips
+    def to_tuple(self):
+        return (self.title, self.skills, self.description, self.roadmap, self.domain)
+
+
+class CareerIndex:
+    """Immutable view of the career catalog, built once and shared by every request.
+
+    Holds the synonym map inverted into a term -> expansion lookup, each career's
+    pre-expanded keyword set and a keyword -> careers posting map, so scoring a
+    profile only touches the careers that share a token with it.
+    """
+
+    def __init__(self, careers, synonyms):
+        # `careers` are catalog dicts (see Career.from_dict)
+        careers = list(careers)
+        self.synonym_groups = synonyms
+        # Identifies this catalog + synonym map; changes whenever either does
+        self.fingerprint = hashlib.sha256(
+            json.dumps([careers, synonyms], sort_keys=True).encode()
+        ).hexdigest()[:16]
+        self.careers = tuple(Career.from_dict(career) for career in careers)
+
+        # Every term of a synonym group expands to the whole group; a term that
+        # belongs to several groups expands to their union.
+        expansions = {}
+        for key, syns in synonyms.items():
+            group = [sys.intern(key)] + [sys.intern(s) for s in syns]
+            for term in group:
+                expansions.setdefault(term, set()).update(group)
+        self.synonyms = {term: frozenset(group) for term, group in expansions.items()}
+
+        self.keywords = tuple(
+            frozenset(self.expand(s.lower() for s in career.skills))
+            for career in self.careers
+        )
+
+        postings = {}
+        for career_id, keywords in enumerate(self.keywords):
+            for kw in keywords:
+                postings.setdefault(kw, []).append(career_id)
+        self.postings = {kw: tuple(ids) for kw, ids in postings.items()}
+        self.fuzzy = FuzzyIndex(self.postings)
+
+        # Position of each career when ordered by title, then catalog order
+        order = sorted(range(len(self.careers)), key=lambda i: (self.careers[i].title, i))
+        rank = [0] * len(order)
+        for position, career_id in enumerate(order):
+            rank[career_id] = position
+        self.rank = tuple(rank)
+
+        # TF-IDF: smoothed idf per keyword and each career's L2-normalized
+        # keyword vector, stored as weights aligned with the postings
+        n = len(self.careers)
+        self.idf = {kw: math.log((1 + n) / (1 + len(ids))) + 1 for kw, ids in self.postings.items()}
+        norms = [
+            math.sqrt(sum(self.idf[kw] ** 2 for kw in keywords)) or 1.0
+            for keywords in self.keywords
+        ]
+        self.weights = {
+            kw: tuple(self.idf[kw] / norms[career_id] for career_id in ids)
+            for kw, ids in self.postings.items()
+        }
+
+        self.titles = {career.title.strip().lower(): career_id for career_id, career in enumerate(self.careers)}
+
+    # Plain tuples, dicts and strings only, so the state round-trips through marshal
+    def to_state(self):
+        return {
+            "careers": tuple(career.to_tuple() for career in self.careers),
+            "synonym_groups": self.synonym_groups,
+            "fingerprint": self.fingerprint,
+            "synonyms": self.synonyms,
+            "keywords": self.keywords,
+            "postings": self.postings,
+            "rank": self.rank,
+            "idf": self.idf,
+            "weights": self.weights,
+            "titles": self.titles,
+            "fuzzy": self.fuzzy.to_state(),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        # Rebuilds an index from to_state() output without re-deriving anything
+        index = cls.__new__(cls)
+        for name in (
+            "synonym_groups", "fingerprint", "synonyms", "keywords", "postings", "rank", "idf", "weights", "titles",
+        ):
+            setattr(index, name, state[name])
+        index.careers = tuple(Career(*career) for career in state["careers"])
+        index.fuzzy = FuzzyIndex.from_state(state["fuzzy"])
+        return index
+
+    def find(self, title):
+        # Career id for a title, ignoring case and surrounding whitespace
+        return self.titles.get(title.strip().lower())
+
+    def pair_score(self, a, b):
+        # Score career `b` gets for a profile made of career `a`'s keywords
+        ka, kb = self.keywords[a], self.keywords[b]
+        partial = sum(1 for uk in ka for ck in kb if uk != ck and similar(uk, ck))
+        overlap = len(ka & kb)
+        return overlap + 0.5 * partial if partial else overlap
+
+    def expand(self, keywords):
+        expanded = set()
+        for kw in keywords:
+            group = self.synonyms.get(kw)
+            if group is None:
+                expanded.add(sys.intern(kw))
+            else:
+                expanded.update(group)
+        return expanded
+
+    def exact_counts(self, user_keywords):
+        # {career_id: number of user keywords in the career's keyword set}
+        exact = {}
+        for uk in user_keywords:
+            for career_id in self.postings.get(uk, ()):
+                exact[career_id] = exact.get(career_id, 0) + 1
+        return exact
+
+    def fuzzy_candidates(self, user_keywords):
+        # {career keyword: user keywords that may be similar to it}, from the
+        # character bound alone; nothing is run through SequenceMatcher yet
+        pairs = {}
+        for uk in user_keywords:
+            for ck in self.fuzzy.candidates(uk):
+                if ck != uk:
+                    pairs.setdefault(ck, []).append(uk)
+        return pairs
+
+    def top(self, exact, pairs, k):
+        """The `k` best (career_id, score) pairs with a positive score, best first.
+
+        A career scores one point per shared keyword plus 0.5 per distinct
+        user/career keyword pair that is similar but not equal, as in the
+        original per-career loop; the order is (-score, title, catalog index)
+        over the whole catalog. Each career's score is bounded by its
+        exact overlap plus 0.5 per candidate pair; careers are taken from a heap
+        in bound order and their pairs only checked with `similar` while they
+        can still beat the k-th best, so the rest is never sorted or verified.
+        """
+        postings = self.postings
+        potential = {}
+        for ck, users in pairs.items():
+            for career_id in postings[ck]:
+                potential[career_id] = potential.get(career_id, 0) + len(users)
+
+        rank = self.rank
+        queue = [
+            (-(exact.get(career_id, 0) + 0.5 * potential.get(career_id, 0)), rank[career_id], career_id)
+            for career_id in exact.keys() | potential.keys()
+        ]
+        heapq.heapify(queue)
+
+        verified = {}  # career keyword -> number of its candidate pairs that are similar
+        best = []  # min-heap of (score, -rank, career_id), the weakest kept career on top
+        while queue:
+            neg_bound, position, career_id = heapq.heappop(queue)
+            if len(best) == k and (-neg_bound, -position) <= best[0][:2]:
+                break
+            partial = 0
+            if career_id in potential:
+                for ck in self.keywords[career_id]:
+                    users = pairs.get(ck)
+                    if users:
+                        n = verified.get(ck)
+                        if n is None:
+                            n = verified[ck] = sum(1 for uk in users if similar(uk, ck))
+                        partial += n
+            overlap = exact.get(career_id, 0)
+            score = overlap + 0.5 * partial if partial else overlap
+            if not score:
+                continue
+            entry = (score, -position, career_id)
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+        best.sort(reverse=True)
+        return [(career_id, score) for score, _, career_id in best]
+
+    def profile_vector(self, user_keywords):
+        # {keyword: idf} over the catalog vocabulary; an unknown keyword stands in
+        # for the terms it is similar to at FUZZY_WEIGHT, so typos still count
+        idf = self.idf
+        vector = {}
+        for uk in user_keywords:
+            weight = idf.get(uk)
+            if weight is not None:
+                vector[uk] = weight
+                continue
+            for ck in self.fuzzy.matches(uk):
+                vector[ck] = max(vector.get(ck, 0.0), FUZZY_WEIGHT * idf[ck])
+        return vector
+
+    def top_weighted(self, user_keywords, k):
+        """The `k` best (career_id, cosine similarity) pairs in TF-IDF space, best first.
+
+        Rare keywords weigh more than ones most careers share, which separates
+        careers that overlap-counting ties. Scoring is a sparse dot product over
+        the postings of the profile's keywords; ties break by title, then
+        catalog order, as in `top`.
+        """
+        vector = self.profile_vector(user_keywords)
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        scores = {}
+        for kw, weight in vector.items():
+            for career_id, career_weight in zip(self.postings[kw], self.weights[kw]):
+                scores[career_id] = scores.get(career_id, 0.0) + weight * career_weight
+        rank = self.rank
+        best = heapq.nsmallest(k, ((-s, rank[i], i) for i, s in scores.items() if s > 0))
+        return [(career_id, round(-neg / norm, 4)) for neg, _, career_id in best]
+
+
+class ScoringSession:
+    """Overlap scores for one profile, kept current as its keywords change.
+
+    Holds the per-career counts behind the scores of `CareerIndex.top`
+    (shared terms and similar-but-different term pairs) and the careers
+    grouped by score.
+    Expanded terms are reference counted, since synonym groups of different
+    profile keywords can overlap. A keyword that comes or goes only touches
+    the careers listing the terms it adds or drops, or terms similar to
+    them, and ranking reads the best score groups first, so an edit costs
+    about as much as scoring that one keyword. Results are identical to a
+    full recompute.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.keywords = set()  # profile keywords, before synonym expansion
+        self.terms = Counter()  # expanded term -> profile keywords expanding to it
+        self.exact = {}  # career_id -> shared terms
+        self.partial = {}  # career_id -> similar-but-different (term, career keyword) pairs
+        self.scores = {}  # twice the score -> careers scoring that
+
+    def update(self, keywords):
+        # Moves the session to the profile keyword set `keywords`
+        keywords = set(keywords)
+        for kw in self.keywords - keywords:
+            for term in self._expansion(kw):
+                self.terms[term] -= 1
+                if not self.terms[term]:
+                    del self.terms[term]
+                    self._count(term, -1)
+        for kw in keywords - self.keywords:
+            for term in self._expansion(kw):
+                self.terms[term] += 1
+                if self.terms[term] == 1:
+                    self._count(term, 1)
+        self.keywords = keywords
+
+    def _expansion(self, kw):
+        group = self.index.synonyms.get(kw)
+        return group if group is not None else (sys.intern(kw),)
+
+    def _count(self, term, delta):
+        # Adds (delta=1) or removes (delta=-1) one expanded term
+        postings = self.index.postings
+        shared = Counter(postings.get(term, ()))
+        pairs = Counter()
+        for ck in self.index.fuzzy.matches(term):
+            pairs.update(postings[ck])
+
+        exact, partial, scores = self.exact, self.partial, self.scores
+        for career_id in shared.keys() | pairs.keys():
+            e = exact.get(career_id, 0)
+            p = partial.get(career_id, 0)
+            # Doubled, so a similar pair's 0.5 stays an integer
+            old = 2 * e + p
+            e += delta * shared[career_id]
+            p += delta * pairs[career_id]
+            new = 2 * e + p
+            if e:
+                exact[career_id] = e
+            else:
+                exact.pop(career_id, None)
+            if p:
+                partial[career_id] = p
+            else:
+                partial.pop(career_id, None)
+            if old:
+                group = scores[old]
+                group.discard(career_id)
+                if not group:
+                    del scores[old]
+            if new:
+                scores.setdefault(new, set()).add(career_id)
+
+    def top(self, k):
+        # Same (career_id, score) pairs and order as CareerIndex.top
+        rank = self.index.rank
+        ranked = []
+        for doubled in sorted(self.scores, reverse=True):
+            if len(ranked) == k:
+                break
+            ranked += heapq.nsmallest(k - len(ranked), self.scores[doubled], key=rank.__getitem__)
+        return [(career_id, self.score(career_id)) for career_id in ranked]
+
+    def score(self, career_id):
+        overlap = self.exact.get(career_id, 0)
+        partial = self.partial.get(career_id, 0)
+        return overlap + 0.5 * partial if partial else overlap
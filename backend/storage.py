@@ -0,0 +1,460 @@
+# Pluggable storage for users, predictions and feedback
+import json
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from itertools import islice
+
+from passwords import DEFAULT_COST, hash_password, is_hashed
+
+# Retention limits; the oldest entries are dropped beyond these
+MAX_PREDICTIONS = 100_000
+MAX_FEEDBACKS = 100_000
+MAX_HISTORY = 1_000_000
+# Careers listed in a history summary
+TOP_CAREERS = 5
+# SQLite prunes once per this many writes rather than on every insert
+PRUNE_EVERY = 256
+
+
+def history_careers(entry):
+    # Careers a history entry counts towards; the "no strong match" placeholder scores 0
+    return {c["career"] for c in entry["careers"] if c.get("match_score")}
+
+
+def read_legacy_users(path, cost=DEFAULT_COST):
+    # users.json stored plaintext passwords; they are hashed before they reach a store
+    with open(path, "r", encoding="utf-8") as f:
+        legacy = json.load(f)
+    return [
+        dict(user, password=user["password"] if is_hashed(user["password"]) else hash_password(user["password"], cost))
+        for user in legacy.values()
+    ]
+
+
+class MemoryStore:
+    """Process-local store; for development and tests, not shared across workers."""
+
+    def __init__(self, max_predictions=MAX_PREDICTIONS, max_feedbacks=MAX_FEEDBACKS, max_history=MAX_HISTORY):
+        self.max_predictions = max_predictions
+        self.max_history = max_history
+        self._users = {}
+        # user_id -> (sequence, updated_at, prediction), oldest write first
+        self._predictions = OrderedDict()
+        # (sequence, user_id) per write, for export cursors; entries for
+        # predictions rewritten or dropped since are skipped and compacted away
+        self._log = []
+        self._sequence = 0
+        self._feedbacks = deque(maxlen=max_feedbacks)
+        self._feedback_id = 0
+        # user_id -> deque of history entries, oldest first; users in write order for pruning
+        self._history = {}
+        self._history_order = deque()
+        self._history_id = 0
+        # user_id -> {"surveys", "last_survey_at", "careers": {career: count}}, updated on write
+        self._history_stats = {}
+        # user_id -> {career: created_at}
+        self._favorites = {}
+        self._lock = threading.Lock()
+
+    def get_user(self, username):
+        return self._users.get(username)
+
+    def add_user(self, user):
+        return self.add_users([user])[0]
+
+    def add_users(self, users):
+        # Per user, True if created and False if the username was taken
+        created = []
+        with self._lock:
+            for user in users:
+                created.append(user["username"] not in self._users)
+                self._users.setdefault(user["username"], dict(user))
+        return created
+
+    def set_password(self, username, password):
+        with self._lock:
+            if username in self._users:
+                self._users[username] = dict(self._users[username], password=password)
+
+    def import_json(self, path, cost=DEFAULT_COST):
+        if not os.path.exists(path) or self._users:
+            return 0
+        legacy = read_legacy_users(path, cost)
+        self.add_users(legacy)
+        return len(legacy)
+
+    def get_prediction(self, user_id):
+        entry = self._predictions.get(user_id)
+        return entry[2] if entry else None
+
+    def save_predictions(self, predictions, history=()):
+        # `history` entries (dicts with user_id and careers) are appended to each user's history
+        now = time.time()
+        with self._lock:
+            for prediction in predictions:
+                self._sequence += 1
+                self._predictions[prediction["user_id"]] = (self._sequence, now, prediction)
+                self._predictions.move_to_end(prediction["user_id"])
+                self._log.append((self._sequence, prediction["user_id"]))
+            while len(self._predictions) > self.max_predictions:
+                self._predictions.popitem(last=False)
+            if len(self._log) > 2 * len(self._predictions) + PRUNE_EVERY:
+                self._log = [(seq, user_id) for seq, user_id in self._log if self._is_current(seq, user_id)]
+            for entry in history:
+                self._add_history(entry, now)
+
+    def _is_current(self, seq, user_id):
+        entry = self._predictions.get(user_id)
+        return entry is not None and entry[0] == seq
+
+    def _add_history(self, entry, now):
+        user_id = entry["user_id"]
+        self._history_id += 1
+        self._history.setdefault(user_id, deque()).append(dict(entry, id=self._history_id, created_at=now))
+        self._history_order.append(user_id)
+        if len(self._history_order) > self.max_history:
+            oldest = self._history_order.popleft()
+            self._history[oldest].popleft()
+            if not self._history[oldest]:
+                del self._history[oldest]
+
+        stats = self._history_stats.setdefault(user_id, {"surveys": 0, "last_survey_at": None, "careers": {}})
+        stats["surveys"] += 1
+        stats["last_survey_at"] = now
+        for career in history_careers(entry):
+            stats["careers"][career] = stats["careers"].get(career, 0) + 1
+
+    def get_history(self, user_id, before=None, limit=20):
+        # Newest first; `before` is the id of the last entry of the previous page
+        with self._lock:
+            entries = self._history.get(user_id, ())
+            page = []
+            for entry in reversed(entries):
+                if before is not None and entry["id"] >= before:
+                    continue
+                page.append(entry)
+                if len(page) == limit:
+                    break
+            return page
+
+    def get_history_summary(self, user_id, top=TOP_CAREERS):
+        with self._lock:
+            stats = self._history_stats.get(user_id, {"surveys": 0, "last_survey_at": None, "careers": {}})
+            ranked = sorted(stats["careers"].items(), key=lambda item: (-item[1], item[0]))[:top]
+            return {
+                "surveys": stats["surveys"],
+                "last_survey_at": stats["last_survey_at"],
+                "top_careers": [{"career": career, "count": count} for career, count in ranked],
+                "favorites": len(self._favorites.get(user_id, ())),
+            }
+
+    def get_favorites(self, user_id):
+        with self._lock:
+            favorites = self._favorites.get(user_id, {})
+            return [{"career": career, "created_at": created_at} for career, created_at in favorites.items()]
+
+    def add_favorite(self, user_id, career):
+        with self._lock:
+            favorites = self._favorites.setdefault(user_id, {})
+            if career in favorites:
+                return False
+            favorites[career] = time.time()
+            return True
+
+    def remove_favorite(self, user_id, career):
+        with self._lock:
+            return self._favorites.get(user_id, {}).pop(career, None) is not None
+
+    def add_feedbacks(self, feedbacks):
+        now = time.time()
+        with self._lock:
+            for feedback in feedbacks:
+                self._feedback_id += 1
+                self._feedbacks.append(dict(feedback, id=self._feedback_id, created_at=now))
+
+    def export_predictions(self, after, limit):
+        # Up to `limit` predictions written after cursor `after`, oldest first
+        with self._lock:
+            rows = []
+            for seq, user_id in islice(self._log, bisect_left(self._log, (after + 1,)), None):
+                if self._is_current(seq, user_id):
+                    _, updated_at, prediction = self._predictions[user_id]
+                    rows.append({"cursor": seq, "updated_at": updated_at, "prediction": prediction})
+                    if len(rows) == limit:
+                        break
+            return rows
+
+    def export_feedbacks(self, after, limit):
+        with self._lock:
+            if not self._feedbacks:
+                return []
+            skip = max(0, after - self._feedbacks[0]["id"] + 1)
+            return [
+                {"cursor": f["id"], "user_id": f["user_id"], "feedback": f["feedback"], "created_at": f["created_at"]}
+                for f in islice(self._feedbacks, skip, skip + limit)
+            ]
+
+
+class SQLiteStore:
+    """Users, predictions and feedback in an embedded SQLite database.
+
+    Every uvicorn worker opens the same file, so state is consistent across
+    processes. Lookups go through primary-key indexes and each write, or batch
+    of writes, is one small transaction, so cost does not grow with the amount
+    of data. WAL journaling keeps writes atomic and crash-safe while readers
+    proceed.
+    """
+
+    def __init__(self, path, max_predictions=MAX_PREDICTIONS, max_feedbacks=MAX_FEEDBACKS, max_history=MAX_HISTORY):
+        # Connections are opened lazily per thread, so pin the path to the startup cwd
+        self.path = os.path.abspath(path)
+        self.max_predictions = max_predictions
+        self.max_feedbacks = max_feedbacks
+        self.max_history = max_history
+        self._local = threading.local()
+        self._writes = 0
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                " username TEXT PRIMARY KEY,"
+                " password TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                " user_id TEXT PRIMARY KEY,"
+                " data TEXT NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS predictions_updated ON predictions (updated_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS feedbacks ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " user_id TEXT NOT NULL,"
+                " feedback TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            # Every prediction, read per user newest first through (user_id, id)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " user_id TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS history_user ON history (user_id, id)")
+            # Per-user aggregates, updated in the same transaction as each history insert
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS history_stats ("
+                " user_id TEXT PRIMARY KEY,"
+                " surveys INTEGER NOT NULL,"
+                " last_survey_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS history_careers ("
+                " user_id TEXT NOT NULL,"
+                " career TEXT NOT NULL,"
+                " count INTEGER NOT NULL,"
+                " PRIMARY KEY (user_id, career)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS favorites ("
+                " user_id TEXT NOT NULL,"
+                " career TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (user_id, career)) WITHOUT ROWID"
+            )
+
+    def _conn(self):
+        # sqlite3 connections are not shared across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        # Connections are in autocommit mode, where `with conn` opens no
+        # transaction; this makes a group of statements atomic and one commit
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def get_user(self, username):
+        row = self._conn().execute(
+            "SELECT username, password FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"username": row[0], "password": row[1]}
+
+    def add_user(self, user):
+        # False when the username is already taken
+        return self.add_users([user])[0]
+
+    def add_users(self, users):
+        # The whole batch in one transaction; per user, whether it was created
+        with self._transaction() as conn:
+            return [
+                conn.execute(
+                    "INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)",
+                    (user["username"], user["password"]),
+                ).rowcount == 1
+                for user in users
+            ]
+
+    def set_password(self, username, password):
+        with self._transaction() as conn:
+            conn.execute("UPDATE users SET password = ? WHERE username = ?", (password, username))
+
+    def import_json(self, path, cost=DEFAULT_COST):
+        # One-off migration of a legacy users.json; skipped once the table has rows
+        conn = self._conn()
+        if not os.path.exists(path) or conn.execute("SELECT 1 FROM users LIMIT 1").fetchone():
+            return 0
+        legacy = read_legacy_users(path, cost)
+        self.add_users(legacy)
+        return len(legacy)
+
+    def get_prediction(self, user_id):
+        row = self._conn().execute(
+            "SELECT data FROM predictions WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_predictions(self, predictions, history=()):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO predictions (user_id, data, updated_at) VALUES (?, ?, ?)",
+                ((p["user_id"], json.dumps(p), now) for p in predictions),
+            )
+            for entry in history:
+                self._add_history(conn, entry, now)
+            self._maybe_prune(conn, len(predictions))
+
+    def _add_history(self, conn, entry, now):
+        data = {k: v for k, v in entry.items() if k != "user_id"}
+        conn.execute(
+            "INSERT INTO history (user_id, data, created_at) VALUES (?, ?, ?)",
+            (entry["user_id"], json.dumps(data), now),
+        )
+        conn.execute(
+            "INSERT INTO history_stats (user_id, surveys, last_survey_at) VALUES (?, 1, ?)"
+            " ON CONFLICT (user_id) DO UPDATE SET surveys = surveys + 1, last_survey_at = excluded.last_survey_at",
+            (entry["user_id"], now),
+        )
+        conn.executemany(
+            "INSERT INTO history_careers (user_id, career, count) VALUES (?, ?, 1)"
+            " ON CONFLICT (user_id, career) DO UPDATE SET count = count + 1",
+            ((entry["user_id"], career) for career in history_careers(entry)),
+        )
+
+    def get_history(self, user_id, before=None, limit=20):
+        rows = self._conn().execute(
+            "SELECT id, data, created_at FROM history WHERE user_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (user_id, before if before is not None else 1 << 62, limit),
+        ).fetchall()
+        return [dict(json.loads(r[1]), user_id=user_id, id=r[0], created_at=r[2]) for r in rows]
+
+    def get_history_summary(self, user_id, top=TOP_CAREERS):
+        conn = self._conn()
+        stats = conn.execute(
+            "SELECT surveys, last_survey_at FROM history_stats WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        careers = conn.execute(
+            "SELECT career, count FROM history_careers WHERE user_id = ? ORDER BY count DESC, career LIMIT ?",
+            (user_id, top),
+        ).fetchall()
+        favorites = conn.execute("SELECT COUNT(*) FROM favorites WHERE user_id = ?", (user_id,)).fetchone()
+        return {
+            "surveys": stats[0] if stats else 0,
+            "last_survey_at": stats[1] if stats else None,
+            "top_careers": [{"career": career, "count": count} for career, count in careers],
+            "favorites": favorites[0],
+        }
+
+    def get_favorites(self, user_id):
+        rows = self._conn().execute(
+            "SELECT career, created_at FROM favorites WHERE user_id = ? ORDER BY created_at", (user_id,)
+        ).fetchall()
+        return [{"career": r[0], "created_at": r[1]} for r in rows]
+
+    def add_favorite(self, user_id, career):
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO favorites (user_id, career, created_at) VALUES (?, ?, ?)",
+                (user_id, career, time.time()),
+            )
+        return cursor.rowcount == 1
+
+    def remove_favorite(self, user_id, career):
+        with self._transaction() as conn:
+            cursor = conn.execute("DELETE FROM favorites WHERE user_id = ? AND career = ?", (user_id, career))
+        return cursor.rowcount == 1
+
+    def add_feedbacks(self, feedbacks):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO feedbacks (user_id, feedback, created_at) VALUES (?, ?, ?)",
+                ((f["user_id"], f["feedback"], now) for f in feedbacks),
+            )
+            self._maybe_prune(conn, len(feedbacks))
+
+    # Export cursors are rowids. INSERT OR REPLACE gives a rewritten prediction
+    # a new, higher rowid, so resuming from a cursor also picks up updates.
+    def export_predictions(self, after, limit):
+        rows = self._conn().execute(
+            "SELECT rowid, updated_at, data FROM predictions WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (after, limit),
+        ).fetchall()
+        return [{"cursor": r[0], "updated_at": r[1], "prediction": json.loads(r[2])} for r in rows]
+
+    def export_feedbacks(self, after, limit):
+        rows = self._conn().execute(
+            "SELECT id, user_id, feedback, created_at FROM feedbacks WHERE id > ? ORDER BY id LIMIT ?",
+            (after, limit),
+        ).fetchall()
+        return [{"cursor": r[0], "user_id": r[1], "feedback": r[2], "created_at": r[3]} for r in rows]
+
+    def _maybe_prune(self, conn, writes):
+        self._writes += writes
+        if self._writes < PRUNE_EVERY:
+            return
+        self._writes = 0
+        conn.execute(
+            "DELETE FROM predictions WHERE user_id IN ("
+            " SELECT user_id FROM predictions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_predictions,),
+        )
+        conn.execute(
+            "DELETE FROM feedbacks WHERE id <= (SELECT MAX(id) FROM feedbacks) - ?",
+            (self.max_feedbacks,),
+        )
+        # Aggregates keep counting entries pruned from the history itself
+        conn.execute(
+            "DELETE FROM history WHERE id <= (SELECT MAX(id) FROM history) - ?",
+            (self.max_history,),
+        )
+
+
+def make_store(backend, path, **limits):
+    if backend == "memory":
+        return MemoryStore(**limits)
+    if backend == "sqlite":
+        return SQLiteStore(path, **limits)
+    raise ValueError(f"Unknown state backend: {backend}")
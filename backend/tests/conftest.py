@@ -0,0 +1,56 @@
+# Shared fixtures; also lets the tests import the backend modules when pytest is
+# run from backend/ or the repo root
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """The `main` module on a fresh in-memory store, with cheap hashing and no rate limits.
+
+    Runs in a scratch directory so no users.json or state.db of the checkout is touched.
+    """
+    import main
+    from writebehind import GroupCommitQueue
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "STATE_BACKEND", "memory")
+    monkeypatch.setattr(main, "store", None)
+    monkeypatch.setattr(main, "PASSWORD_COST", 16)
+    monkeypatch.setattr(main, "ADMIN_USERS", {"admin"})
+    monkeypatch.setattr(main.predict_limiter, "rate", 0)
+    monkeypatch.setattr(main.login_limiter, "rate", 0)
+    monkeypatch.setattr(main, "user_writes", GroupCommitQueue(main.commit_users, main.WRITE_BATCH_INTERVAL))
+    monkeypatch.setattr(main, "feedback_writes", GroupCommitQueue(main.commit_feedbacks, main.WRITE_BATCH_INTERVAL))
+    main.token_cache.clear()
+    main.prediction_cache.clear()
+    return main
+
+
+def auth_headers(client, username, password="pw"):
+    # Signs the user up (if needed) and logs in
+    client.post("/auth/signup", json={"username": username, "password": password})
+    token = client.post("/auth/token", data={"username": username, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def profile(user_id, skills=("python",)):
+    # A survey answer set; the skills decide the suggested careers
+    return {
+        "user_id": user_id, "skills": list(skills), "education": "PhD",
+        "interests": ["math"], "personality": "curious", "goals": "build software",
+    }
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
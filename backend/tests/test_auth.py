@@ -0,0 +1,75 @@
+# The LRU cache and the verified-token cache in front of it
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from cache import LRUCache
+from conftest import Clock, auth_headers
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b", None) is None
+    assert cache.pop("a") == 1 and cache.get("a", None) is None
+    assert cache.stats() == {"size": 1, "maxsize": 2, "ttl": None, "hits": 2, "misses": 2, "evictions": 1}
+
+
+def test_lru_cache_expires_entries():
+    clock = Clock()
+    cache = LRUCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+    clock.now = 10
+    assert cache.get("a", None) is None
+    assert cache.get("b") == 2
+    clock.now = 30
+    assert cache.pop("b", None) is None
+    assert len(cache) == 0 and cache.evictions == 2
+
+
+def test_verified_tokens_are_cached(api):
+    token = api.create_access_token({"sub": "alice"})
+    assert api.verify_token(token) == "alice"
+    assert api.verify_token(token) == "alice"
+    assert api.token_cache.stats()["hits"] == 1
+    # A cached token is never decoded again
+    api.SECRET_KEY, secret = "rotated", api.SECRET_KEY
+    try:
+        assert api.verify_token(token) == "alice"
+    finally:
+        api.SECRET_KEY = secret
+
+
+def test_token_cache_never_outlives_the_token(api, monkeypatch):
+    monkeypatch.setattr(api, "ACCESS_TOKEN_EXPIRE_MINUTES", 1)
+    token = api.create_access_token({"sub": "alice"})
+    api.verify_token(token)
+    key = next(iter(api.token_cache._data))
+    expires = api.token_cache._data[key][1]
+    assert expires <= time.monotonic() + 60
+
+
+@pytest.mark.parametrize("claims", [{"sub": "alice", "exp": 1}, {"name": "alice"}])
+def test_bad_tokens_are_rejected_and_not_cached(api, claims):
+    token = api.jwt.encode(claims, api.SECRET_KEY, algorithm=api.ALGORITHM)
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc:
+            api.verify_token(token)
+        assert exc.value.status_code == 401
+    assert len(api.token_cache) == 0
+
+
+def test_endpoints_reject_tampered_tokens(api):
+    with TestClient(api.app) as client:
+        headers = auth_headers(client, "alice")
+        assert client.get("/history/alice", headers=headers).status_code == 200
+        forged = {"Authorization": headers["Authorization"][:-2] + "xx"}
+        assert client.get("/history/alice", headers=forged).status_code == 401
+        unknown = {"Authorization": "Bearer " + api.create_access_token({"sub": "mallory"})}
+        assert client.get("/history/mallory", headers=unknown).status_code == 401
@@ -0,0 +1,90 @@
+# NDJSON exports: admin only, gzip on request, resumable from any cursor
+import asyncio
+import json
+import zlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import auth_headers, profile
+from export import gzip_chunks, ndjson_chunks
+
+
+@pytest.fixture
+def client(api):
+    with TestClient(api.app) as client:
+        yield client
+
+
+def lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def collect(chunks):
+    async def drain():
+        return [chunk async for chunk in chunks]
+    return asyncio.run(drain())
+
+
+def test_exports_are_admin_only(client):
+    headers = auth_headers(client, "alice")
+    assert client.get("/export/predictions", headers=headers).status_code == 403
+    assert client.get("/export/feedback", headers=headers).status_code == 403
+    assert client.get("/export/feedback").status_code == 401
+
+
+def test_prediction_export_resumes_from_a_cursor(client):
+    admin = auth_headers(client, "admin")
+    for user in ("alice", "bob", "carol"):
+        headers = auth_headers(client, user)
+        assert client.post("/predict-career-content-based", json=profile(user), headers=headers).status_code == 200
+
+    rows = lines(client.get("/export/predictions", headers=admin))
+    assert [row["prediction"]["user_id"] for row in rows] == ["alice", "bob", "carol"]
+    cursors = [row["cursor"] for row in rows]
+    assert cursors == sorted(cursors)
+    resumed = lines(client.get("/export/predictions", params={"cursor": cursors[0]}, headers=admin))
+    assert resumed == rows[1:]
+
+    # A new survey moves alice's prediction past everyone else's
+    headers = auth_headers(client, "alice")
+    client.post("/predict-career-content-based", json=profile("alice", ["medicine"]), headers=headers)
+    resumed = lines(client.get("/export/predictions", params={"cursor": cursors[-1]}, headers=admin))
+    assert [row["prediction"]["user_id"] for row in resumed] == ["alice"]
+
+
+def test_feedback_export_is_gzipped_on_request(client, api):
+    admin = auth_headers(client, "admin")
+    api.get_store().add_feedbacks([{"user_id": "alice", "feedback": f"note {i}"} for i in range(3)])
+
+    response = client.get("/export/feedback", headers=dict(admin, **{"Accept-Encoding": "gzip"}))
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [row["feedback"] for row in lines(response)] == ["note 0", "note 1", "note 2"]
+    plain = client.get("/export/feedback", headers=dict(admin, **{"Accept-Encoding": "identity"}))
+    assert "content-encoding" not in plain.headers
+    assert lines(plain) == lines(response)
+
+
+def test_ndjson_chunks_page_through_the_store():
+    rows = [{"cursor": cursor} for cursor in range(1, 6)]
+    queries = []
+
+    def fetch(after, limit):
+        queries.append(after)
+        return [row for row in rows if row["cursor"] > after][:limit]
+
+    chunks = collect(ndjson_chunks(fetch, after=1, chunk_size=2))
+    assert [json.loads(line) for chunk in chunks for line in chunk.splitlines()] == rows[1:]
+    assert queries == [1, 3, 5]
+
+
+def test_gzip_chunks_decode_as_they_arrive():
+    async def source():
+        yield b'{"cursor": 1}\n'
+        yield b'{"cursor": 2}\n'
+
+    decoder = zlib.decompressobj(31)
+    chunks = collect(gzip_chunks(source()))
+    assert decoder.decompress(chunks[0]) == b'{"cursor": 1}\n'
+    assert decoder.decompress(b"".join(chunks[1:])) == b'{"cursor": 2}\n'
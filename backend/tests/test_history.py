@@ -0,0 +1,56 @@
+# Survey history, its summary and favorites: ownership and paging
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import auth_headers, profile
+
+
+@pytest.fixture
+def client(api):
+    with TestClient(api.app) as client:
+        yield client
+
+
+def test_history_pages_newest_first(client):
+    headers = auth_headers(client, "alice")
+    for skills in (["python"], ["medicine"], ["art"], ["law"], ["math"]):
+        assert client.post("/predict-career-content-based", json=profile("alice", skills), headers=headers).status_code == 200
+
+    seen, before = [], None
+    while True:
+        params = {"limit": 2} if before is None else {"limit": 2, "before": before}
+        page = client.get("/history/alice", params=params, headers=headers).json()
+        seen += page["items"]
+        before = page["next"]
+        if before is None:
+            break
+    assert [item["skills"] for item in seen] == [["math"], ["law"], ["art"], ["medicine"], ["python"]]
+    assert [item["id"] for item in seen] == sorted((item["id"] for item in seen), reverse=True)
+    assert client.get("/history/alice/summary", headers=headers).json()["surveys"] == 5
+
+
+def test_other_users_history_and_favorites_are_forbidden(client):
+    alice = auth_headers(client, "alice")
+    bob = auth_headers(client, "bob")
+    admin = auth_headers(client, "admin")
+    for method, path in (
+        ("GET", "/history/alice"), ("GET", "/history/alice/summary"), ("GET", "/favorites/alice"),
+        ("PUT", "/favorites/alice/Data Scientist"), ("DELETE", "/favorites/alice/Data Scientist"),
+    ):
+        assert client.request(method, path, headers=bob).status_code == 403, (method, path)
+    assert client.put("/favorites/alice/Data Scientist", headers=alice).json()["created"] is True
+    assert client.get("/favorites/alice", headers=admin).json()[0]["career"] == "Data Scientist"
+
+
+def test_predictions_only_add_to_the_callers_history(client, api):
+    bob = auth_headers(client, "bob")
+    admin = auth_headers(client, "admin")
+    client.post("/predict-career-content-based", json=profile("alice"), headers=bob)
+    client.post("/predict-career-content-based/batch", json=[profile("alice"), profile("carol")], headers=bob)
+    store = api.get_store()
+    assert store.get_history_summary("alice")["surveys"] == 0
+    assert store.get_history_summary("carol")["surveys"] == 0
+
+    client.post("/predict-career-content-based", json=profile("bob"), headers=bob)
+    client.post("/predict-career-content-based/batch", json=[profile("alice"), profile("carol")], headers=admin)
+    assert [store.get_history_summary(u)["surveys"] for u in ("alice", "bob", "carol")] == [1, 1, 1]
@@ -0,0 +1,87 @@
+# Per-user token buckets and sharing of identical in-flight predictions
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from cache import SingleFlight
+from conftest import Clock, auth_headers, profile
+from ratelimit import TokenBucketLimiter
+
+
+def test_bucket_allows_a_burst_then_refills():
+    clock = Clock()
+    limiter = TokenBucketLimiter(rate=2, burst=3, clock=clock)
+    assert [limiter.acquire("a") for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("a") == 0.5
+    # Other users have their own bucket
+    assert limiter.acquire("b") == 0
+    clock.now = 0.5
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") > 0
+    clock.now = 100
+    assert [limiter.acquire("a") for _ in range(3)] == [0, 0, 0]
+    assert limiter.rejected == 2
+
+
+def test_zero_rate_disables_limiting():
+    limiter = TokenBucketLimiter(rate=0, burst=1)
+    assert all(limiter.acquire("a") == 0 for _ in range(100))
+    assert len(limiter) == 0
+
+
+def test_only_the_most_recent_keys_are_kept():
+    limiter = TokenBucketLimiter(rate=1, burst=1, maxsize=2, clock=Clock())
+    for key in ("a", "b", "c"):
+        limiter.acquire(key)
+    assert len(limiter) == 2
+    # "a" was forgotten, so it starts with a full bucket again
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("c") == 1
+
+
+def test_predictions_over_the_limit_get_429(api, monkeypatch):
+    monkeypatch.setattr(api.predict_limiter, "rate", 0.001)
+    monkeypatch.setattr(api.predict_limiter, "burst", 2)
+    with TestClient(api.app) as client:
+        headers = auth_headers(client, "alice")
+        codes = [client.post("/predict-career-content-based", json=profile("alice"), headers=headers) for _ in range(3)]
+        assert [response.status_code for response in codes] == [200, 200, 429]
+        assert int(codes[-1].headers["Retry-After"]) > 0
+        # Limits are per user
+        other = auth_headers(client, "bob")
+        assert client.post("/predict-career-content-based", json=profile("bob"), headers=other).status_code == 200
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.run("k", compute, 21) for _ in range(3)), flight.run("j", compute, 1))
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+    assert results == [42, 42, 42, 2]
+    assert sorted(calls) == [1, 21]
+    assert flight.shared == 2 and len(flight) == 0
+
+
+def test_a_cancelled_caller_does_not_cancel_the_shared_work():
+    async def compute():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def scenario():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.run("k", compute))
+        second = asyncio.ensure_future(flight.run("k", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
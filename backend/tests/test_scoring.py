@@ -0,0 +1,176 @@
+# Every optimized scorer must rank exactly like the original per-career loop
+#
+#   cd backend && python -m pytest tests
+#
+# The reference below is that loop as it first shipped in main.py: expand the
+# profile through the synonym map, score every career by shared keywords plus
+# 0.5 per similar-but-different pair, sort the whole catalog by score, then
+# title, and keep the first k careers that scored. CareerIndex.top, the batch
+# scorer and scoring sessions are compared against it on random profiles.
+import os
+import random
+import string
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+import pytest
+
+from batch_scoring import BatchScorer, RelatedCareers
+from catalog import merge_duplicates, parse_catalog
+from recommender import CareerIndex, ScoringSession
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "careers.json")
+
+
+@lru_cache(maxsize=None)
+def reference_similar(a, b):
+    return SequenceMatcher(None, a, b).ratio() > 0.7
+
+
+def reference_expand(keywords, synonyms):
+    expanded = set()
+    for kw in keywords:
+        expanded.add(kw)
+        for k, syns in synonyms.items():
+            if kw == k or kw in syns:
+                expanded.add(k)
+                expanded.update(syns)
+    return expanded
+
+
+def reference_ranking(careers, synonyms, keywords):
+    # The whole catalog as (title, score), best first
+    user_keywords = reference_expand(keywords, synonyms)
+    scored_careers = []
+    for career in careers:
+        career_keywords = reference_expand([s.lower() for s in career["skills"]], synonyms)
+        overlap = len(user_keywords.intersection(career_keywords))
+        for uk in user_keywords:
+            for ck in career_keywords:
+                if uk != ck and reference_similar(uk, ck):
+                    overlap += 0.5
+        scored_careers.append((overlap, career))
+    scored_careers.sort(key=lambda x: (-x[0], x[1]["title"]))
+    return [(career["title"], score) for score, career in scored_careers]
+
+
+def reference_top(ranking, k):
+    return [(title, score) for title, score in ranking[:k] if score > 0]
+
+
+def titled(index, ranked):
+    return [(index.careers[career_id].title, score) for career_id, score in ranked]
+
+
+def vocabulary(careers, synonyms):
+    terms = {skill.lower() for career in careers for skill in career["skills"]}
+    for key, syns in synonyms.items():
+        terms.add(key)
+        terms.update(syns)
+    return sorted(terms)
+
+
+def invented_word(rng):
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+
+
+def random_term(rng, terms):
+    roll = rng.random()
+    if roll < 0.6:
+        return rng.choice(terms)
+    if roll < 0.8:
+        # A typo, which only the fuzzy matching can pick up
+        word = rng.choice(terms)
+        i = rng.randrange(len(word))
+        return word[:i] + word[i + 1:]
+    if roll < 0.9:
+        return " ".join(rng.choice(terms) for _ in range(rng.randint(2, 4)))
+    return invented_word(rng)
+
+
+def random_keywords(rng, terms):
+    return {random_term(rng, terms) for _ in range(rng.randint(1, 12))}
+
+
+def builtin_catalog():
+    with open(CATALOG_FILE, encoding="utf-8") as f:
+        return parse_catalog(f.read())
+
+
+def synthetic_catalog(size=200, seed=0):
+    # The built-in careers plus generated ones, with clashing titles so the
+    # title tie-break and duplicate merging get exercised too
+    rng = random.Random(seed)
+    careers, synonyms = builtin_catalog()
+    terms = vocabulary(careers, synonyms)
+    invented = [invented_word(rng) for _ in range(60)]
+    generated = list(careers)
+    for i in range(size):
+        generated.append({
+            "title": f"Occupation {rng.randrange(size // 3):03d}" + ("" if rng.random() < 0.8 else " ii"),
+            "skills": rng.sample(terms, rng.randint(2, 6)) + rng.sample(invented, rng.randint(0, 2)),
+            "description": f"Synthetic occupation {i}.",
+            "roadmap": ["Learn the basics"],
+        })
+    return merge_duplicates(generated), synonyms
+
+
+# (catalog, random profiles scored against it); the reference is slow on big catalogs
+@pytest.fixture(scope="module", params=[("builtin", 400), ("synthetic", 150)], ids=lambda param: param[0])
+def catalog(request):
+    name, count = request.param
+    careers, synonyms = builtin_catalog() if name == "builtin" else synthetic_catalog()
+    index = CareerIndex(careers, synonyms)
+    rng = random.Random(name)
+    terms = vocabulary(careers, synonyms)
+    profiles = [random_keywords(rng, terms) for _ in range(count)]
+    rankings = [reference_ranking(careers, synonyms, keywords) for keywords in profiles]
+    return careers, synonyms, index, profiles, rankings
+
+
+@pytest.mark.parametrize("k", [3, 10])
+def test_index_top_matches_reference(catalog, k):
+    careers, synonyms, index, profiles, rankings = catalog
+    for keywords, ranking in zip(profiles, rankings):
+        expanded = index.expand(keywords)
+        ranked = index.top(index.exact_counts(expanded), index.fuzzy_candidates(expanded), k)
+        assert titled(index, ranked) == reference_top(ranking, k), keywords
+
+
+@pytest.mark.parametrize("k", [3, 10])
+def test_batch_scorer_matches_reference(catalog, k):
+    careers, synonyms, index, profiles, rankings = catalog
+    batch = BatchScorer(index).score([index.expand(keywords) for keywords in profiles], top_k=k)
+    for keywords, ranking, ranked in zip(profiles, rankings, batch):
+        assert titled(index, ranked) == reference_top(ranking, k), keywords
+
+
+def test_scoring_session_matches_reference(catalog):
+    # Sessions walk through single-keyword edits, as a user editing their profile would
+    careers, synonyms, index, profiles, _ = catalog
+    rng = random.Random(0)
+    terms = vocabulary(careers, synonyms)
+    for keywords in profiles[:50]:
+        session = ScoringSession(index)
+        keywords = set(keywords)
+        for _ in range(6):
+            session.update(keywords)
+            expected = reference_top(reference_ranking(careers, synonyms, keywords), 5)
+            assert titled(index, session.top(5)) == expected, keywords
+            if len(keywords) > 1 and rng.random() < 0.5:
+                keywords.discard(rng.choice(sorted(keywords)))
+            else:
+                keywords.add(random_term(rng, terms))
+
+
+def test_related_careers_match_the_reference(catalog):
+    # Each career's neighbours are the reference ranking for its own keywords, minus itself
+    careers, synonyms, index, _, _ = catalog
+    related = RelatedCareers.build(index, size=5)
+    for career_id, career in enumerate(index.careers):
+        skills = {s.lower() for s in career.skills}
+        expected = [(t, s) for t, s in reference_ranking(careers, synonyms, skills) if t != career.title and s > 0][:5]
+        neighbours = related.neighbours(career_id)
+        assert titled(index, neighbours) == expected, career.title
+        for other, score in neighbours:
+            assert related.score(career_id, other) == score == index.pair_score(career_id, other)
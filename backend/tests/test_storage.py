@@ -0,0 +1,102 @@
+# Both state stores: users, the legacy import, predictions, history, favorites and export cursors
+import json
+
+import pytest
+
+from passwords import is_hashed, verify_password
+from storage import PRUNE_EVERY, SQLiteStore, make_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return make_store(request.param, str(tmp_path / "state.db"), max_predictions=5, max_feedbacks=5, max_history=50)
+
+
+def test_legacy_users_are_hashed_on_import(store, tmp_path):
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps({
+        "alice": {"username": "alice", "password": "secret"},
+        "bob": {"username": "bob", "password": "hunter2"},
+    }))
+    assert store.import_json(str(path), cost=16) == 2
+    for username, password in (("alice", "secret"), ("bob", "hunter2")):
+        stored = store.get_user(username)["password"]
+        assert is_hashed(stored) and password not in stored
+        assert verify_password(password, stored)
+    # Only ever into an empty store
+    assert store.import_json(str(path), cost=16) == 0
+
+
+def prediction(user_id, career="Data Scientist"):
+    return {"user_id": user_id, "careers": [{"career": career}], "reasoning": "", "roadmap": []}
+
+
+def export_all(fetch, after=0, limit=2):
+    # Follows the cursor like a resuming client would
+    rows = []
+    while True:
+        page = fetch(after, limit)
+        rows += page
+        if len(page) < limit:
+            return rows
+        after = page[-1]["cursor"]
+
+
+def test_users_are_created_once(store):
+    assert store.add_users([{"username": "a", "password": "x"}, {"username": "b", "password": "y"}]) == [True, True]
+    assert store.add_users([{"username": "a", "password": "z"}, {"username": "c", "password": "z"}]) == [False, True]
+    assert store.get_user("a")["password"] == "x"
+    store.set_password("a", "new")
+    assert store.get_user("a") == {"username": "a", "password": "new"}
+    assert store.get_user("nobody") is None
+
+
+def test_latest_prediction_per_user(store):
+    store.save_predictions([prediction("a", "Nurse"), prediction("b")])
+    store.save_predictions([prediction("a", "Chef")])
+    assert store.get_prediction("a")["careers"] == [{"career": "Chef"}]
+    assert store.get_prediction("nobody") is None
+    # Export holds each user's current prediction once, oldest write first
+    rows = export_all(store.export_predictions)
+    assert [row["prediction"]["user_id"] for row in rows] == ["b", "a"]
+    assert rows[-1]["prediction"]["careers"] == [{"career": "Chef"}]
+    assert export_all(store.export_predictions, after=rows[0]["cursor"]) == rows[1:]
+
+
+def test_history_summary_and_favorites(store):
+    store.save_predictions(
+        [prediction("a")] * 3,
+        [{"user_id": "a", "careers": [{"career": c, "match_score": 1}]} for c in ("Nurse", "Chef", "Nurse")],
+    )
+    history = store.get_history("a")
+    assert [entry["careers"][0]["career"] for entry in history] == ["Nurse", "Chef", "Nurse"]
+    assert store.get_history("a", before=history[0]["id"], limit=1) == history[1:2]
+    assert store.add_favorite("a", "Chef") is True
+    assert store.add_favorite("a", "Chef") is False
+    summary = store.get_history_summary("a")
+    assert summary["surveys"] == 3 and summary["favorites"] == 1
+    assert summary["top_careers"] == [{"career": "Nurse", "count": 2}, {"career": "Chef", "count": 1}]
+    assert store.remove_favorite("a", "Chef") is True
+    assert store.remove_favorite("a", "Chef") is False
+    assert store.get_favorites("a") == []
+    assert store.get_history("b") == [] and store.get_history_summary("b")["surveys"] == 0
+
+
+def test_feedback_export_resumes_and_is_bounded(store):
+    store.add_feedbacks([{"user_id": "a", "feedback": f"note {i}"} for i in range(PRUNE_EVERY + 5)])
+    rows = export_all(store.export_feedbacks, limit=100)
+    # max_feedbacks=5: the oldest entries are dropped, the cursors keep increasing
+    assert [row["feedback"] for row in rows] == [f"note {i}" for i in range(PRUNE_EVERY, PRUNE_EVERY + 5)]
+    assert export_all(store.export_feedbacks, after=rows[1]["cursor"]) == rows[2:]
+
+
+def test_sqlite_stores_share_state(tmp_path):
+    # What one worker writes, another worker's store sees
+    path = str(tmp_path / "state.db")
+    first, second = SQLiteStore(path), SQLiteStore(path)
+    first.add_users([{"username": "a", "password": "x"}])
+    first.save_predictions([prediction("a")])
+    second.add_feedbacks([{"user_id": "a", "feedback": "hi"}])
+    assert second.get_user("a")["password"] == "x"
+    assert second.get_prediction("a")["user_id"] == "a"
+    assert first.export_feedbacks(0, 10)[0]["feedback"] == "hi"
@@ -0,0 +1,112 @@
+# Group commit: batching, failures, shutdown flushes and use across event loops
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import auth_headers
+from writebehind import GroupCommitQueue
+
+
+class Recorder:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    async def __call__(self, items):
+        if self.fail:
+            raise RuntimeError("store down")
+        self.batches.append(list(items))
+        return [item * 10 for item in items]
+
+
+def test_concurrent_writes_share_a_batch():
+    commit = Recorder()
+    queue = GroupCommitQueue(commit, interval=0.05, max_batch=100)
+
+    async def scenario():
+        return await asyncio.gather(*(queue.submit(i) for i in range(5)))
+
+    assert asyncio.run(scenario()) == [0, 10, 20, 30, 40]
+    assert commit.batches == [[0, 1, 2, 3, 4]]
+
+
+def test_full_batch_commits_without_waiting():
+    commit = Recorder()
+    queue = GroupCommitQueue(commit, interval=60, max_batch=3)
+
+    async def scenario():
+        return await asyncio.wait_for(asyncio.gather(*(queue.submit(i) for i in range(6))), 5)
+
+    assert asyncio.run(scenario()) == [0, 10, 20, 30, 40, 50]
+    assert commit.batches == [[0, 1, 2], [3, 4, 5]]
+
+
+def test_failed_commit_raises_in_every_writer():
+    queue = GroupCommitQueue(Recorder(fail=True), interval=0)
+
+    async def scenario():
+        return await asyncio.gather(queue.submit(1), queue.submit(2), return_exceptions=True)
+
+    assert [type(r) for r in asyncio.run(scenario())] == [RuntimeError, RuntimeError]
+
+
+def test_close_flushes_fire_and_forget_writes():
+    commit = Recorder()
+    queue = GroupCommitQueue(commit, interval=60)
+
+    async def scenario():
+        queue.enqueue(1)
+        queue.enqueue(2)
+        await asyncio.wait_for(queue.close(), 5)
+
+    asyncio.run(scenario())
+    assert commit.batches == [[1, 2]]
+    assert len(queue) == 0
+
+
+def test_queue_moves_to_a_new_event_loop():
+    # Items left behind by a loop that went away are committed by the next one
+    commit = Recorder()
+    queue = GroupCommitQueue(commit, interval=60)
+
+    async def first():
+        queue.enqueue(1)
+
+    async def second():
+        return await asyncio.wait_for(asyncio.gather(queue.submit(2), queue.close()), 5)
+
+    asyncio.run(first())
+    assert asyncio.run(second())[0] == 20
+    assert commit.batches == [[1, 2]]
+
+
+def test_signups_without_lifespan(api):
+    # No `with` block: every request runs on its own event loop
+    client = TestClient(api.app)
+    assert client.post("/auth/signup", json={"username": "a", "password": "pw"}).status_code == 200
+    assert client.post("/auth/signup", json={"username": "b", "password": "pw"}).status_code == 200
+    assert client.post("/auth/signup", json={"username": "b", "password": "pw"}).status_code == 400
+
+
+def test_shutdown_commits_queued_feedback(api):
+    with TestClient(api.app) as client:
+        headers = auth_headers(client, "a")
+        api.feedback_writes.interval = 60
+        for i in range(3):
+            assert client.post("/feedback", json={"user_id": "a", "feedback": f"note {i}"}, headers=headers).status_code == 200
+        assert api.get_store().export_feedbacks(0, 10) == []
+    assert [f["feedback"] for f in api.get_store().export_feedbacks(0, 10)] == ["note 0", "note 1", "note 2"]
+
+
+def test_bulk_feedback_is_group_committed(api):
+    with TestClient(api.app) as client:
+        headers = auth_headers(client, "a")
+        notes = [{"user_id": "a", "feedback": f"note {i}"} for i in range(20)]
+        assert client.post("/feedback/bulk", json=notes, headers=headers).json()["count"] == 20
+        assert client.post("/feedback/bulk", json=notes * 60, headers=headers).status_code == 422
+    assert len(api.get_store().export_feedbacks(0, 100)) == 20
+    assert (api.feedback_writes.batches, api.feedback_writes.items) == (1, 20)
+    with TestClient(api.app) as client:
+        metrics = client.get("/metrics").text
+    assert 'group_commit_writes{queue="feedback",stat="items"} 20' in metrics
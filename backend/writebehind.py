@@ -0,0 +1,122 @@
+# Write-behind queue that group-commits store writes in batches
+import asyncio
+import logging
+from contextlib import suppress
+
+logger = logging.getLogger(__name__)
+
+
+class GroupCommitQueue:
+    """Collects writes and hands them to `commit(items)` in batches.
+
+    A batch is committed `interval` seconds after its first item arrived, or
+    as soon as `max_batch` items are waiting, so a burst of writes costs one
+    store transaction (and one fsync) per batch instead of one per item.
+    `commit` is a coroutine function returning one result per item.
+
+    Event-loop only, so no lock. The worker task starts with the first write
+    and belongs to that write's loop; a write from another loop (the app run
+    without its lifespan, e.g. by a test client) starts a fresh worker there.
+    close() commits whatever is still queued and stops it.
+    """
+
+    def __init__(self, commit, interval=0.01, max_batch=500):
+        self.commit = commit
+        self.interval = interval
+        self.max_batch = max_batch
+        self.batches = 0
+        self.items = 0
+        self._pending = []
+        self._task = None
+        self._closing = False
+
+    def submit(self, item):
+        # Future for the item's commit result; await it to know the write is durable
+        future = asyncio.get_running_loop().create_future()
+        self._put(item, future)
+        return future
+
+    def enqueue(self, item):
+        # Fire and forget: a failed commit is logged rather than raised
+        self._put(item, None)
+
+    def _put(self, item, future):
+        self._ensure_worker()
+        self._pending.append((item, future))
+        self._arrived.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+
+    def _ensure_worker(self):
+        # A worker left on another (possibly closed) loop can't be woken from
+        # this one, so its events and task are replaced; what it left queued
+        # is committed by the new worker
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        self._arrived = asyncio.Event()
+        self._full = asyncio.Event()
+        self._closing = False
+        self._task = loop.create_task(self._run())
+        if self._pending:
+            self._arrived.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+
+    async def _run(self):
+        while True:
+            await self._arrived.wait()
+            if not self._closing:
+                # Give concurrent writers the interval to join the batch, unless it fills up first
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._full.wait(), self.interval)
+            if self._pending:
+                await self._flush()
+            if self._closing and not self._pending:
+                return
+
+    async def _flush(self):
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if not self._pending:
+            self._arrived.clear()
+        if len(self._pending) < self.max_batch:
+            self._full.clear()
+        try:
+            results = await self.commit([item for item, _ in batch])
+        except Exception as exc:
+            logger.exception("Committing a batch of %d writes failed", len(batch))
+            for _, future in batch:
+                if _waiting(future):
+                    future.set_exception(exc)
+            return
+        self.batches += 1
+        self.items += len(batch)
+        for (_, future), result in zip(batch, results):
+            if _waiting(future):
+                future.set_result(result)
+
+    async def close(self):
+        # Commits everything queued so far, e.g. on shutdown
+        if self._task is None:
+            return
+        if self._task.get_loop() is not asyncio.get_running_loop():
+            if not self._pending:
+                self._task = None
+                return
+            self._ensure_worker()
+        self._closing = True
+        self._arrived.set()
+        self._full.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+            self._closing = False
+
+    def __len__(self):
+        return len(self._pending)
+
+
+def _waiting(future):
+    # Someone may still await this result; futures of a closed loop can't be resolved
+    return future is not None and not future.done() and not future.get_loop().is_closed()
@@ -128,8 +128,8 @@ function App() {
             <SurveyForm token={token} userId={userId} onResult={r => { setLoading(true); setTimeout(() => { setLoading(false); handleSurveyResult(r); }, 1200); }} />
           </div>
         )}
-        {page === 'dashboard' && <div className={fadeClass}><Dashboard result={result} onEdit={() => { setResult(null); setPage('survey'); }} userId={userId} /></div>}
-        {page === 'profile' && (userId ? <div className={fadeClass}><Profile userId={userId} onBack={() => setPage('dashboard')} onLogout={handleLogout} /></div> : <div className={fadeClass}><Auth setToken={handleSetToken} /></div>)}
+        {page === 'dashboard' && <div className={fadeClass}><Dashboard result={result} onEdit={() => { setResult(null); setPage('survey'); }} userId={userId} token={token} /></div>}
+        {page === 'profile' && (userId ? <div className={fadeClass}><Profile userId={userId} token={token} onBack={() => setPage('dashboard')} onLogout={handleLogout} /></div> : <div className={fadeClass}><Auth setToken={handleSetToken} /></div>)}
   {/* Forum and Compare pages removed */}
         {loading && (
           <div className="fixed inset-0 flex items-center justify-center bg-black bg-opacity-30 z-40">
@@ -11,29 +11,28 @@ const BADGES = [
   { key: 'profile_pic', label: 'Profile Pic', icon: '🖼️', desc: 'Uploaded a profile picture.' },
 ];
 
-function getEarnedBadges(userId) {
+// `summary` is the /history/{userId}/summary response (survey and favorite counts)
+function getEarnedBadges(userId, summary) {
   let earned = [];
   try {
-    const history = JSON.parse(localStorage.getItem('surveyHistory') || '[]');
-    const favs = JSON.parse(localStorage.getItem('favorites') || '[]');
     const avatar = localStorage.getItem(`avatar_${userId}`);
     const loginStreak = parseInt(localStorage.getItem(`loginStreak_${userId}`) || '0', 10);
     const level = parseInt(localStorage.getItem(`level_${userId}`) || '1', 10);
-    const surveyCount = history.filter(h => h.user_id === userId).length;
+    const surveyCount = summary?.surveys || 0;
     if (surveyCount > 0) earned.push('first_survey');
     if (surveyCount >= 5) earned.push('five_surveys');
     if (surveyCount >= 10) earned.push('ten_surveys');
     if (loginStreak >= 3) earned.push('streak_3');
     if (loginStreak >= 7) earned.push('streak_7');
     if (level >= 5) earned.push('level_5');
-    if (favs.filter(f => f.userId === userId).length > 0) earned.push('first_favorite');
+    if ((summary?.favorites || 0) > 0) earned.push('first_favorite');
     if (avatar) earned.push('profile_pic');
   } catch {}
   return BADGES.filter(b => earned.includes(b.key));
 }
 
-function BadgeDisplay({ userId }) {
-  const badges = getEarnedBadges(userId);
+function BadgeDisplay({ userId, summary }) {
+  const badges = getEarnedBadges(userId, summary);
   if (!userId) return null;
   return (
     <div className="mb-8">
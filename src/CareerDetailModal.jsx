@@ -1,6 +1,13 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
+import { getRelatedCareers } from './api';
 
-function CareerDetailModal({ career, onClose }) {
+function CareerDetailModal({ career, token, onClose }) {
+  const [related, setRelated] = useState([]);
+  useEffect(() => {
+    setRelated([]);
+    if (!career || !token) return;
+    getRelatedCareers(career.career, token, 5).then(res => setRelated(res.data.related)).catch(() => setRelated([]));
+  }, [career, token]);
   if (!career) return null;
   // Example details; in a real app, fetch more info from backend or a DB
   const details = {
@@ -28,6 +35,14 @@ function CareerDetailModal({ career, onClose }) {
         <div className="mb-1"><span className="font-semibold">Key Skills:</span> {info.skills}</div>
         <div className="mb-1"><span className="font-semibold">Salary Range:</span> {info.salary}</div>
         <div className="mb-1"><span className="font-semibold">Job Outlook:</span> {info.outlook}</div>
+        {related.length > 0 && (
+          <div className="mt-4">
+            <div className="font-semibold mb-1">Related Careers:</div>
+            <ul className="list-disc list-inside text-gray-700">
+              {related.map(r => <li key={r.career}>{r.career} <span className="text-gray-500 text-sm">({r.domain})</span></li>)}
+            </ul>
+          </div>
+        )}
       </div>
     </div>
   );
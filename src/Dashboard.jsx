@@ -5,26 +5,29 @@ import SurveyHistory from './SurveyHistory';
 import BadgeDisplay from './BadgeDisplay';
 import { useEffect } from 'react';
 import CareerDetailModal from './CareerDetailModal';
+import { addFavorite, getFavorites, getHistorySummary, removeFavorite } from './api';
 
 
-function Dashboard({ result, onEdit, userId }) {
+function Dashboard({ result, onEdit, userId, token }) {
   const [checked, setChecked] = useState(Array(result?.roadmap?.length || 0).fill(false));
   const [copied, setCopied] = useState(false);
   const [favorites, setFavorites] = useState([]);
   if (!result) return null;
 
   // Add or remove a favorite career for the user
-  const handleFavorite = (careerObj) => {
-    const favs = JSON.parse(localStorage.getItem('favorites') || '[]');
-    const exists = favs.some(f => f.userId === userId && f.career === careerObj.career);
-    let updated;
-    if (exists) {
-      updated = favs.filter(f => !(f.userId === userId && f.career === careerObj.career));
-    } else {
-      updated = [...favs, { userId, career: careerObj.career }];
+  const handleFavorite = async (careerObj) => {
+    const exists = favorites.some(f => f.career === careerObj.career);
+    try {
+      if (exists) {
+        await removeFavorite(userId, careerObj.career, token);
+        setFavorites(favs => favs.filter(f => f.career !== careerObj.career));
+      } else {
+        await addFavorite(userId, careerObj.career, token);
+        setFavorites(favs => [...favs, { career: careerObj.career }]);
+      }
+    } catch (e) {
+      console.error('Error updating favorites:', e);
     }
-    localStorage.setItem('favorites', JSON.stringify(updated));
-    setFavorites(updated.filter(f => f.userId === userId));
   };
 
   const handleCheck = idx => {
@@ -52,13 +55,13 @@ function Dashboard({ result, onEdit, userId }) {
   // User avatar (first letter of userId)
   const avatar = userId ? userId[0].toUpperCase() : 'U';
   const [showDetail, setShowDetail] = useState(null);
-  const [surveyCount, setSurveyCount] = useState(0);
+  const [summary, setSummary] = useState(null);
   useEffect(() => {
-    const favs = JSON.parse(localStorage.getItem('favorites') || '[]');
-    setFavorites(favs.filter(f => f.userId === userId));
-    const history = JSON.parse(localStorage.getItem('surveyHistory') || '[]');
-    setSurveyCount(history.filter(h => h.user_id === userId).length);
-  }, [userId]);
+    if (!userId || !token) return;
+    getFavorites(userId, token).then(res => setFavorites(res.data)).catch(() => setFavorites([]));
+    getHistorySummary(userId, token).then(res => setSummary(res.data)).catch(() => setSummary(null));
+  }, [userId, token]);
+  const surveyCount = summary?.surveys || 0;
 
   return (
   <div className="max-w-5xl mx-auto bg-white shadow-2xl rounded-3xl p-16 mt-20">
@@ -75,11 +78,11 @@ function Dashboard({ result, onEdit, userId }) {
         <div className="text-lg font-semibold text-yellow-600">Favorites: <span className="text-yellow-800">{favorites.length}</span></div>
         <div className="text-md italic text-purple-700 mt-2 md:mt-0">Tip: Explore details by clicking a career!</div>
       </div>
-  <BadgeDisplay userId={userId} />
+  <BadgeDisplay userId={userId} summary={summary && { ...summary, favorites: favorites.length }} />
   <h2 className="text-3xl font-bold text-blue-700 mb-4 text-center">Your Career Suggestions</h2>
       <div className="grid gap-4 mb-6">
         {result.careers.map((c, i) => {
-          const isFav = favorites.some(f => f.career === c.career && f.userId === userId);
+          const isFav = favorites.some(f => f.career === c.career);
           return (
             <div key={i} className={`border p-4 rounded-lg flex items-center justify-between shadow-sm ${i === 0 ? 'bg-blue-50 border-blue-400' : 'bg-gray-50'}`}>
               <div className="cursor-pointer" onClick={() => setShowDetail(c)}>
@@ -98,7 +101,7 @@ function Dashboard({ result, onEdit, userId }) {
           );
         })}
       </div>
-      {showDetail && <CareerDetailModal career={showDetail} onClose={() => setShowDetail(null)} />}
+      {showDetail && <CareerDetailModal career={showDetail} token={token} onClose={() => setShowDetail(null)} />}
       {/* Favorites Section */}
       <div className="mb-8">
         <h3 className="text-xl font-bold text-yellow-600 mb-2">Your Favorites</h3>
@@ -134,7 +137,7 @@ function Dashboard({ result, onEdit, userId }) {
       </div>
 
       <div className="mt-12">
-        <SurveyHistory userId={userId} />
+        <SurveyHistory userId={userId} token={token} />
       </div>
     </div>
   );
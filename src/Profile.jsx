@@ -1,10 +1,11 @@
 
-import React, { useState, useRef } from 'react';
+import React, { useState, useRef, useEffect } from 'react';
 import SurveyHistory from './SurveyHistory';
 import BadgeDisplay from './BadgeDisplay';
+import { getHistorySummary } from './api';
 // import { useNavigate } from 'react-router-dom';
 
-function Profile({ userId, onBack, onLogout }) {
+function Profile({ userId, token, onBack, onLogout }) {
   if (!userId) {
     return (
       <div className="max-w-xl mx-auto bg-white shadow-2xl rounded-3xl p-12 mt-32 text-center animate-fade-in">
@@ -25,6 +26,11 @@ function Profile({ userId, onBack, onLogout }) {
   const fileInputRef = useRef();
   const [edit, setEdit] = useState(false);
   const [msg, setMsg] = useState('');
+  const [summary, setSummary] = useState(null);
+  useEffect(() => {
+    if (!userId || !token) return;
+    getHistorySummary(userId, token).then(res => setSummary(res.data)).catch(() => setSummary(null));
+  }, [userId, token]);
 
   const handleChange = e => {
     setProfile({ ...profile, [e.target.name]: e.target.value });
@@ -50,7 +56,7 @@ function Profile({ userId, onBack, onLogout }) {
   return (
     <div className="max-w-3xl mx-auto bg-white shadow-2xl rounded-3xl p-16 mt-20 animate-fade-in">
   <h2 className="text-3xl font-extrabold text-transparent bg-clip-text bg-gradient-to-r from-blue-700 via-purple-700 to-pink-600 text-center mb-6 tracking-tight drop-shadow-lg">Profile</h2>
-  <BadgeDisplay userId={userId} />
+  <BadgeDisplay userId={userId} summary={summary} />
   <div className="flex flex-col items-center">
         <div className="w-24 h-24 rounded-full bg-blue-600 flex items-center justify-center text-white text-4xl font-bold mb-4 overflow-hidden relative group cursor-pointer" onClick={() => fileInputRef.current.click()} title="Click to upload/change profile picture">
           {avatar ? (
@@ -94,7 +100,7 @@ function Profile({ userId, onBack, onLogout }) {
       </div>
 
       <div className="mt-12">
-        <SurveyHistory userId={userId} />
+        <SurveyHistory userId={userId} token={token} />
       </div>
     </div>
   );
@@ -49,20 +49,8 @@ function SurveyForm({ token, userId, onResult }) {
         goals: form.goals
       };
       const res = await predictCareer(payload, token);
+      // The backend records the survey in the user's history
       onResult(res.data);
-      // Save to survey history in localStorage
-      const history = JSON.parse(localStorage.getItem('surveyHistory') || '[]');
-      history.push({
-        user_id: userId,
-        date: new Date().toLocaleString(),
-        skills: payload.skills,
-        education: payload.education,
-        interests: payload.interests,
-        personality: payload.personality,
-        goals: payload.goals,
-        careers: res.data.careers
-      });
-      localStorage.setItem('surveyHistory', JSON.stringify(history));
     } catch (err) {
       const detail = err.response?.data?.detail;
       if (typeof detail === 'string') {
@@ -1,21 +1,22 @@
 import React, { useEffect, useState } from 'react';
+import { getHistory } from './api';
 
-function SurveyHistory({ userId }) {
+function SurveyHistory({ userId, token }) {
   const [history, setHistory] = useState([]);
-  useEffect(() => {
-    // For demo: load from localStorage
+  const [next, setNext] = useState(null);
+  const loadPage = async (before) => {
     try {
-      const h = JSON.parse(localStorage.getItem('surveyHistory') || '[]');
-      if (Array.isArray(h)) {
-        setHistory(h.filter(x => x.user_id === userId));
-      } else {
-        setHistory([]);
-      }
+      const res = await getHistory(userId, token, before);
+      setHistory(h => (before ? [...h, ...res.data.items] : res.data.items));
+      setNext(res.data.next);
     } catch (e) {
       console.error('Error loading survey history:', e);
-      setHistory([]);
+      if (!before) setHistory([]);
     }
-  }, [userId]);
+  };
+  useEffect(() => {
+    if (userId && token) loadPage();
+  }, [userId, token]);
   if (!userId) return null;
   return (
     <div className="max-w-3xl mx-auto bg-white shadow-xl rounded-2xl p-10 mt-12 animate-fade-in">
@@ -24,9 +25,9 @@ function SurveyHistory({ userId }) {
         <div className="text-gray-500 text-center">No survey history found.</div>
       ) : (
         <ul className="space-y-4">
-          {history.map((h, i) => (
-            <li key={i} className="border rounded p-4 bg-gray-50">
-              <div className="font-semibold">Date: {h.date || 'Unknown'}</div>
+          {history.map(h => (
+            <li key={h.id} className="border rounded p-4 bg-gray-50">
+              <div className="font-semibold">Date: {h.created_at ? new Date(h.created_at * 1000).toLocaleString() : 'Unknown'}</div>
               <div><span className="font-semibold">Skills:</span> {h.skills.join(', ')}</div>
               <div><span className="font-semibold">Education:</span> {h.education}</div>
               <div><span className="font-semibold">Interests:</span> {h.interests.join(', ')}</div>
@@ -37,6 +38,11 @@ function SurveyHistory({ userId }) {
           ))}
         </ul>
       )}
+      {next && (
+        <div className="text-center mt-4">
+          <button onClick={() => loadPage(next)} className="bg-blue-600 hover:bg-blue-700 text-white px-4 py-2 rounded font-semibold">Load more</button>
+        </div>
+      )}
     </div>
   );
 }
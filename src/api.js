@@ -19,3 +19,15 @@ export const getResults = (userId, token) =>
   API.get(`/results/${userId}`, { headers: { Authorization: `Bearer ${token}` } });
 export const sendFeedback = (data, token) =>
   API.post('/feedback', data, { headers: { Authorization: `Bearer ${token}` } });
+export const getHistory = (userId, token, before) =>
+  API.get(`/history/${encodeURIComponent(userId)}`, { params: { before }, headers: { Authorization: `Bearer ${token}` } });
+export const getHistorySummary = (userId, token) =>
+  API.get(`/history/${encodeURIComponent(userId)}/summary`, { headers: { Authorization: `Bearer ${token}` } });
+export const getFavorites = (userId, token) =>
+  API.get(`/favorites/${encodeURIComponent(userId)}`, { headers: { Authorization: `Bearer ${token}` } });
+export const addFavorite = (userId, career, token) =>
+  API.put(`/favorites/${encodeURIComponent(userId)}/${encodeURIComponent(career)}`, null, { headers: { Authorization: `Bearer ${token}` } });
+export const removeFavorite = (userId, career, token) =>
+  API.delete(`/favorites/${encodeURIComponent(userId)}/${encodeURIComponent(career)}`, { headers: { Authorization: `Bearer ${token}` } });
+export const getRelatedCareers = (title, token, limit) =>
+  API.get(`/careers/${encodeURIComponent(title)}/related`, { params: { limit }, headers: { Authorization: `Bearer ${token}` } });